@@ -29,6 +29,7 @@ else:
         set_date_created,
         add_meta,
         add_to_revision,
+        add_to_revision_bulk,
         create_revision,
         register,
         is_registered,
@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.core import serializers
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
@@ -6,3 +8,10 @@ class ReversionConfig(AppConfig):
     name = 'reversion'
     verbose_name = _('Reversion')
     default_auto_field = 'django.db.models.AutoField'
+
+    def ready(self):
+        from reversion import serializers as reversion_serializers
+        from reversion.revisions import _clear_content_types
+        serializers.register_serializer(reversion_serializers.FORMAT, "reversion.serializers")
+        # Content types may be recreated by migrations, so cached content types must be discarded.
+        post_migrate.connect(_clear_content_types)
@@ -0,0 +1,93 @@
+"""
+An optional cache of deserialized versions.
+
+Versions are never changed once saved, so the result of deserializing them can be cached. The cache is enabled by
+setting ``REVERSION_CACHE_SIZE`` to the maximum number of entries to keep in a process-wide LRU cache. Setting
+``REVERSION_CACHE_BACKEND`` to the alias of a Django cache additionally shares entries between processes.
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+_MISSING = object()
+
+
+class VersionCache:
+
+    """A bounded LRU cache, with hit and miss counters."""
+
+    def __init__(self, max_size, backend=None):
+        self.max_size = max_size
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                pass
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.backend is not None:
+            value = caches[self.backend].get(key, _MISSING)
+            if value is not _MISSING:
+                self._set_local(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def set(self, key, value):
+        self._set_local(key, value)
+        if self.backend is not None:
+            caches[self.backend].set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+
+
+def get_cache():
+    """Returns the configured version cache, or None if caching is disabled."""
+    global _cache
+    if _cache is None:
+        max_size = getattr(settings, "REVERSION_CACHE_SIZE", 0)
+        if not max_size:
+            return None
+        _cache = VersionCache(max_size, backend=getattr(settings, "REVERSION_CACHE_BACKEND", None))
+    return _cache
+
+
+@receiver(setting_changed)
+def _reset_cache(setting, **kwargs):
+    global _cache
+    if setting in ("REVERSION_CACHE_SIZE", "REVERSION_CACHE_BACKEND"):
+        _cache = None
@@ -0,0 +1,67 @@
+from itertools import islice
+from django.db import transaction, router
+from django.utils import timezone
+from reversion.models import Tombstone, Version
+from reversion.management.commands import BaseRevisionCommand
+from reversion.revisions import _get_content_type, _get_options
+
+
+class Command(BaseRevisionCommand):
+
+    help = "Creates tombstones for deleted objects of models registered with tombstones, for a given app [and model]."
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            action="store",
+            type=int,
+            default=500,
+            help="For large sets of data, tombstones will be created in batches. Defaults to 500.",
+        )
+
+    def handle(self, *app_labels, **options):
+        verbosity = options["verbosity"]
+        using = options["using"]
+        model_db = options["model_db"]
+        batch_size = options["batch_size"]
+        using = using or router.db_for_write(Tombstone)
+        # The time the objects were deleted isn't known, so as_of() treats them as existing until now.
+        deleted_at = timezone.now()
+        with transaction.atomic(using=using):
+            for model in self.get_models(options):
+                if not _get_options(model).tombstones:
+                    continue
+                if verbosity >= 1:
+                    self.stdout.write("Creating tombstones for {name}".format(
+                        name=model._meta.verbose_name,
+                    ))
+                content_type = _get_content_type(model, using)
+                model_db_name = model_db or router.db_for_write(model)
+                # Objects deleted before tombstones were enabled can only be found by an anti-join.
+                deleted_versions = Version.objects.using(using)._get_deleted_by_anti_join(
+                    model,
+                    model_db_name,
+                ).order_by().values_list("pk", "object_id").iterator()
+                created_count = 0
+                while True:
+                    batch = list(islice(deleted_versions, batch_size))
+                    if not batch:
+                        break
+                    # Existing tombstones are left unchanged.
+                    Tombstone.objects.using(using).bulk_create([
+                        Tombstone(
+                            content_type=content_type,
+                            object_id=object_id,
+                            db=model_db_name,
+                            version_id=version_pk,
+                            deleted_at=deleted_at,
+                        )
+                        for version_pk, object_id in batch
+                    ], ignore_conflicts=True)
+                    created_count += len(batch)
+                # Print out a message, if feeling verbose.
+                if verbosity >= 1:
+                    self.stdout.write("- Found {total} deleted objects".format(
+                        total=created_count,
+                    ))
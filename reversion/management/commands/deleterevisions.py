@@ -1,8 +1,9 @@
 from datetime import timedelta
 from django.db import transaction, models, router
 from django.utils import timezone
-from reversion.models import Revision, Version
+from reversion.models import Revision, Version, VersionPayload
 from reversion.management.commands import BaseRevisionCommand
+from reversion.revisions import _filter_in_chunks
 
 
 class Command(BaseRevisionCommand):
@@ -86,9 +87,40 @@ class Command(BaseRevisionCommand):
                 ).order_by()
             else:
                 revisions_to_delete = Revision.objects.using(using).none()
+            # Keep the revisions holding keyframes of delta-encoded versions that are kept.
+            revisions_to_delete = revisions_to_delete.exclude(
+                pk__in=self.get_keyframe_revision_ids(revisions_to_delete, using),
+            )
             # Print out a message, if feeling verbose.
             if verbosity >= 1:
                 self.stdout.write("Deleting {total} revisions...".format(
                     total=revisions_to_delete.count(),
                 ))
             revisions_to_delete.delete()
+            # Delete deduplicated payloads no longer used by any version.
+            VersionPayload.objects.using(using).filter(version__isnull=True).delete()
+
+    def get_keyframe_revision_ids(self, revisions_to_delete, using):
+        keyframe_revision_ids = set()
+        # Find the versions to delete that are keyframes of kept delta-encoded versions, using the keyframe index.
+        keyframes = Version.objects.using(using).filter(revision__in=revisions_to_delete)
+        new_revision_ids = set(keyframes.filter(models.Exists(
+            Version.objects.using(using).filter(
+                keyframe=models.OuterRef("pk"),
+            ).exclude(revision__in=revisions_to_delete),
+        )).values_list("revision_id", flat=True).distinct().iterator())
+        # Kept keyframe revisions can contain delta-encoded versions of other objects, so repeat until none are added.
+        while new_revision_ids:
+            keyframe_revision_ids.update(new_revision_ids)
+            new_revision_ids = {
+                revision_id
+                for delta_versions in _filter_in_chunks(
+                    Version.objects.using(using).filter(keyframe__isnull=False),
+                    "revision_id",
+                    new_revision_ids,
+                )
+                for revision_id in keyframes.filter(
+                    pk__in=delta_versions.values("keyframe"),
+                ).values_list("revision_id", flat=True).distinct()
+            } - keyframe_revision_ids
+        return keyframe_revision_ids
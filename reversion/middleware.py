@@ -11,12 +11,15 @@ class RevisionMiddleware:
 
     atomic = True
 
+    defer = False
+
     def __init__(self, get_response):
         self.get_response = create_revision(
             manage_manually=self.manage_manually,
             using=self.using,
             atomic=self.atomic,
-            request_creates_revision=self.request_creates_revision
+            request_creates_revision=self.request_creates_revision,
+            defer=self.defer,
         )(get_response)
 
     def request_creates_revision(self, request):
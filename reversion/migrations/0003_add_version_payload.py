@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reversion', '0002_add_index_on_version_for_content_type_and_db'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionPayload',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(help_text='The SHA-256 hash of the serialized data.', max_length=64, unique=True)),
+                ('serialized_data', models.TextField(help_text='The serialized form of the versions sharing this payload.')),
+            ],
+            options={
+                'verbose_name': 'version payload',
+                'verbose_name_plural': 'version payloads',
+            },
+        ),
+        migrations.AddField(
+            model_name='version',
+            name='payload',
+            field=models.ForeignKey(blank=True, help_text='The shared serialized data of this version, if deduplicated.', null=True, on_delete=django.db.models.deletion.PROTECT, to='reversion.versionpayload'),
+        ),
+    ]
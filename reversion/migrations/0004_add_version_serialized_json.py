@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:09
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reversion', '0003_add_version_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='version',
+            name='serialized_json',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='The serialized form of this version of the model, if stored as JSON.', null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reversion', '0004_add_version_serialized_json'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionFieldChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(help_text='The name of the changed field.', max_length=191)),
+                ('version', models.ForeignKey(help_text='The version in which the field changed.', on_delete=django.db.models.deletion.CASCADE, related_name='field_changes', to='reversion.version')),
+            ],
+            options={
+                'verbose_name': 'version field change',
+                'verbose_name_plural': 'version field changes',
+                'indexes': [models.Index(fields=['field_name', 'version'], name='reversion_v_field_n_859d35_idx')],
+            },
+        ),
+    ]
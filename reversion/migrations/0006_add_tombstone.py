@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('reversion', '0005_add_version_field_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(help_text='Primary key of the deleted model.', max_length=191)),
+                ('db', models.CharField(help_text='The database the model was deleted from.', max_length=191)),
+                ('deleted_at', models.DateTimeField(db_index=True, help_text='The date and time this model was deleted.', verbose_name='deleted at')),
+                ('content_type', models.ForeignKey(help_text='Content type of the deleted model.', on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('version', models.ForeignKey(help_text='The latest version of the deleted model.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reversion.version')),
+            ],
+            options={
+                'verbose_name': 'tombstone',
+                'verbose_name_plural': 'tombstones',
+                'ordering': ('-pk',),
+                'unique_together': {('content_type', 'db', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('reversion', '0006_add_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(help_text='Primary key of the model under version control.', max_length=191)),
+                ('db', models.CharField(help_text='The database the model under version control is stored in.', max_length=191)),
+                ('content_type', models.ForeignKey(help_text='Content type of the model under version control.', on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('version', models.ForeignKey(help_text='The latest version of the model.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reversion.version')),
+            ],
+            options={
+                'verbose_name': 'latest version',
+                'verbose_name_plural': 'latest versions',
+                'unique_together': {('content_type', 'db', 'object_id')},
+            },
+        ),
+    ]
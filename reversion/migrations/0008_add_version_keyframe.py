@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def set_version_keyframes(apps, schema_editor):
+    from reversion.revisions import _get_keyframe_pk
+    Version = apps.get_model("reversion", "Version")
+    versions = Version.objects.using(schema_editor.connection.alias).filter(format__contains="+delta")
+    batch = []
+    for version in versions.select_related("payload").iterator(chunk_size=500):
+        version.keyframe_id = _get_keyframe_pk(version)
+        if version.keyframe_id is not None:
+            batch.append(version)
+        if len(batch) >= 500:
+            Version.objects.using(schema_editor.connection.alias).bulk_update(batch, ["keyframe"])
+            batch = []
+    Version.objects.using(schema_editor.connection.alias).bulk_update(batch, ["keyframe"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reversion', '0007_add_latest_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='version',
+            name='keyframe',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='The version this version is delta-encoded against, if delta-encoded.', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='reversion.version'),
+        ),
+        migrations.RunPython(set_version_keyframes, migrations.RunPython.noop),
+    ]
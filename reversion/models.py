@@ -1,6 +1,9 @@
 from collections import defaultdict
-from itertools import chain, groupby
+from itertools import groupby, islice
+import copy
+import json
 import logging
+import zlib
 
 import django
 from django.apps import apps
@@ -8,19 +11,24 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.serializers.base import DeserializationError
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.serializers.base import DeserializationError, DeserializedObject
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import IntegrityError, connections, models, router, transaction
 from django.db.models.deletion import Collector
-from django.db.models.functions import Cast
+from django.db.models.functions import Cast, RowNumber
+from django.db.models.sql.where import AND
 from django.utils.encoding import force_str
 from django.utils.functional import cached_property
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
 
-from reversion.errors import RevertError
-from reversion.revisions import (_follow_relations_recursive,
-                                 _get_content_type, _get_options)
+from reversion.cache import get_cache
+from reversion.errors import RegistrationError, RevertError
+from reversion.revisions import (_ChunkedIn, _In, _follow_relations_recursive, _filter_in_chunks,
+                                 _get_chunk_size, _get_content_type, _get_options, _get_deserializer,
+                                 _decode_version_data, _share_keyframes)
+from reversion.serializers import Deserializer as CompactDeserializer
 
 
 logger = logging.getLogger(__name__)
@@ -95,10 +103,7 @@ class Revision(models.Model):
                         except model.DoesNotExist:
                             pass
                     # Calculate the set of all objects that are in the revision now.
-                    current_revision = chain.from_iterable(
-                        _follow_relations_recursive(obj)
-                        for obj in old_revision
-                    )
+                    current_revision = _follow_relations_recursive(old_revision)
                     # Delete objects that are no longer in the current revision.
                     collector = Collector(using=version_db)
                     new_objs = [item for item in current_revision
@@ -119,8 +124,178 @@ class Revision(models.Model):
         ordering = ("-pk",)
 
 
+def _get_parent_keys(version):
+    """
+    Returns the (revision_id, content_type_id, object_id, db) key of each parent version of the given version.
+
+    Returns None if the version can't be loaded.
+    """
+    try:
+        field_dict = version._local_field_dict
+    except (RevertError, RegistrationError):
+        return None
+    return [
+        (version.revision_id, _get_content_type(parent_model, version._state.db).pk,
+         force_str(field_dict[field.attname]), version.db)
+        for parent_model, field in version._model._meta.concrete_model._meta.parents.items()
+    ]
+
+
+def _prefetch_field_dicts(versions):
+    """Sets the field_dict of each of the given versions, loading parent versions in one query per level."""
+    # Load the parent versions, one inheritance level at a time.
+    parent_versions = {}
+    level_versions = versions
+    while level_versions:
+        parent_keys = {
+            parent_key
+            for version in level_versions
+            for parent_key in _get_parent_keys(version) or ()
+            if parent_key not in parent_versions
+        }
+        level_versions = []
+        if not parent_keys:
+            break
+        db = versions[0]._state.db
+        for parent_versions_chunk in _filter_in_chunks(
+            Version.objects.using(db).filter(
+                content_type_id__in={content_type_id for _, content_type_id, _, _ in parent_keys},
+            ),
+            "revision_id",
+            {revision_id for revision_id, _, _, _ in parent_keys},
+        ):
+            for parent_version in parent_versions_chunk:
+                parent_key = (
+                    parent_version.revision_id,
+                    parent_version.content_type_id,
+                    parent_version.object_id,
+                    parent_version.db,
+                )
+                if parent_key in parent_keys:
+                    parent_versions[parent_key] = parent_version
+                    level_versions.append(parent_version)
+
+    # Merge the field dicts, parents first.
+    def get_field_dict(version):
+        if "field_dict" not in version.__dict__:
+            parent_keys = _get_parent_keys(version)
+            if parent_keys is None:
+                return None
+            parent_field_dicts = []
+            for parent_key in parent_keys:
+                if parent_key not in parent_versions:
+                    # Leave the field dict to be loaded (or fail) lazily.
+                    return None
+                parent_field_dict = get_field_dict(parent_versions[parent_key])
+                if parent_field_dict is None:
+                    return None
+                parent_field_dicts.append(parent_field_dict)
+            field_dict = version._local_field_dict
+            for parent_field_dict in parent_field_dicts:
+                field_dict.update(parent_field_dict)
+            version.field_dict = field_dict
+        return version.field_dict
+
+    for version in versions:
+        get_field_dict(version)
+
+
 class VersionQuerySet(models.QuerySet):
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._with_field_dicts = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_field_dicts = self._with_field_dicts
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        if fetched and self._get_chunked_lookup()[1] is not None:
+            self._result_cache = list(self._iter_chunked())
+            self._prefetch_done = True
+        super()._fetch_all()
+        if fetched and self._result_cache and isinstance(self._result_cache[0], Version):
+            _share_keyframes(self._result_cache)
+            if self._with_field_dicts:
+                _prefetch_field_dicts(self._result_cache)
+
+    def count(self):
+        if self._result_cache is None and not self.query.is_sliced and self._get_chunked_lookup()[1] is not None:
+            return sum(queryset.count() for queryset in self._get_chunked_querysets())
+        return super().count()
+
+    def exists(self):
+        if self._result_cache is None and not self.query.is_sliced and self._get_chunked_lookup()[1] is not None:
+            return any(queryset.exists() for queryset in self._get_chunked_querysets())
+        return super().exists()
+
+    def iterator(self, chunk_size=None):
+        if self._get_chunked_lookup()[1] is not None:
+            return self._iter_chunked()
+        return super().iterator(chunk_size=chunk_size)
+
+    def _get_chunked_lookup(self):
+        where = self.query.where
+        if where.connector == AND and not where.negated:
+            for index, child in enumerate(where.children):
+                if isinstance(child, _ChunkedIn):
+                    return index, child
+        return None, None
+
+    def _get_chunked_querysets(self, values=None):
+        """Returns a copy of this queryset for each chunk of the values of its chunked lookup."""
+        index, lookup = self._get_chunked_lookup()
+        values = list(lookup.rhs) if values is None else values
+        chunk_size = _get_chunk_size(self.db)
+        for i in range(0, len(values), chunk_size):
+            queryset = self._chain()
+            queryset.query.where.children[index] = _In(lookup.lhs, values[i:i + chunk_size])
+            yield queryset
+
+    def _get_ordering(self):
+        if self.query.order_by:
+            ordering = self.query.order_by
+        elif self.query.default_ordering:
+            ordering = self.model._meta.ordering
+        else:
+            ordering = ()
+        for order_by in ordering:
+            if isinstance(order_by, str):
+                if order_by != "?":
+                    yield models.F(order_by.lstrip("-")), order_by.startswith("-")
+            elif isinstance(order_by, models.OrderBy):
+                yield order_by.expression, order_by.descending
+            else:
+                yield order_by, False
+
+    def _iter_chunked(self):
+        queryset = self._chain()
+        low_mark, high_mark = queryset.query.low_mark, queryset.query.high_mark
+        queryset.query.clear_limits()
+        pks = None
+        ordering = list(self._get_ordering())
+        if ordering or low_mark or high_mark is not None:
+            # Each chunk is only ordered by itself, so find the order of the whole result from the ordering values.
+            rows = [
+                row
+                for chunk_queryset in queryset._get_chunked_querysets()
+                for row in chunk_queryset.values_list("pk", *(expression for expression, descending in ordering))
+            ]
+            for i, (expression, descending) in reversed(list(enumerate(ordering, 1))):
+                rows.sort(key=lambda row: (row[i] is None, row[i]), reverse=descending)
+            pks = [row[0] for row in rows][low_mark:high_mark]
+        # Consecutive chunks of the ordered pks are loaded in order.
+        for chunk_queryset in queryset._get_chunked_querysets(pks):
+            yield from chunk_queryset
+
+    def with_field_dicts(self):
+        clone = self._chain()
+        clone._with_field_dicts = True
+        return clone
+
     def get_for_model(self, model, model_db=None):
         model_db = model_db or router.db_for_write(model)
         content_type = _get_content_type(model, self.db)
@@ -137,10 +312,145 @@ class VersionQuerySet(models.QuerySet):
     def get_for_object(self, obj, model_db=None):
         return self.get_for_object_reference(obj.__class__, obj.pk, model_db=model_db)
 
+    def get_for_object_references(self, model, object_ids, model_db=None, latest=None):
+        """
+        Returns the versions of the model instances with the given primary keys, in a single query.
+
+        If ``latest`` is given, only the latest ``latest`` versions of each model instance are returned.
+        """
+        versions = self.get_for_model(model, model_db=model_db).filter(
+            object_id__in={force_str(object_id) for object_id in object_ids},
+        )
+        if latest is None:
+            return versions
+        connection = connections[self.db]
+        if connection.features.supports_over_clause:
+            latest_pks = versions.annotate(_row_number=models.Window(
+                RowNumber(),
+                partition_by=[models.F("object_id")],
+                order_by=models.F("pk").desc(),
+            )).filter(_row_number__lte=latest).values("pk")
+        else:
+            # Count the newer versions of each version's object instead.
+            latest_pks = versions.annotate(_newer_count=models.Subquery(
+                Version.objects.filter(
+                    content_type=models.OuterRef("content_type"),
+                    db=models.OuterRef("db"),
+                    object_id=models.OuterRef("object_id"),
+                    pk__gt=models.OuterRef("pk"),
+                ).order_by().values("object_id").annotate(count=models.Count("pk")).values("count"),
+            )).filter(
+                models.Q(_newer_count__lt=latest) | models.Q(_newer_count__isnull=True),
+            ).values("pk")
+        return versions.filter(pk__in=latest_pks)
+
+    def get_for_objects(self, objs, model_db=None, latest=None):
+        """Returns the versions of the given instances of a single model, in a single query."""
+        objs = [obj for obj in objs if obj.pk is not None]
+        if not objs:
+            return self.none()
+        return self.get_for_object_references(
+            objs[0].__class__,
+            [obj.pk for obj in objs],
+            model_db=model_db,
+            latest=latest,
+        )
+
+    def prefetch_for_objects(self, objs, to_attr="versions", model_db=None, latest=None):
+        """
+        Sets ``to_attr`` on each of the given instances of a single model to a list of its versions.
+
+        The versions are loaded in a single query, like ``Prefetch(..., to_attr=...)`` for a relation.
+        """
+        objs = list(objs)
+        versions_by_object_id = defaultdict(list)
+        for version in self.get_for_objects(objs, model_db=model_db, latest=latest):
+            versions_by_object_id[version.object_id].append(version)
+        for obj in objs:
+            setattr(obj, to_attr, versions_by_object_id.get(force_str(obj.pk), []))
+
+    def get_latest(self, model, model_db=None):
+        """Returns the latest version of each object of the given model."""
+        return self._get_latest(model, model_db)
+
+    def get_latest_for_object_reference(self, model, object_id, model_db=None):
+        return self._get_latest(model, model_db, object_id=object_id)
+
+    def get_latest_for_object(self, obj, model_db=None):
+        return self.get_latest_for_object_reference(obj.__class__, obj.pk, model_db=model_db)
+
+    def _get_latest(self, model, model_db, object_id=None):
+        model_db = model_db or router.db_for_write(model)
+        versions = self.get_for_model(model, model_db=model_db)
+        if object_id is not None:
+            versions = versions.filter(object_id=object_id)
+        if _get_options(model).track_latest:
+            # The latest versions are looked up by their unique key, rather than grouping the version history.
+            latest_versions = LatestVersion.objects.using(self.db).filter(
+                content_type=_get_content_type(model, self.db),
+                db=model_db,
+            )
+            if object_id is not None:
+                latest_versions = latest_versions.filter(object_id=object_id)
+            # Objects versioned before track_latest was enabled have no pointer, so are found by grouping instead.
+            untracked_versions = versions.exclude(object_id__in=latest_versions.values("object_id"))
+            return versions.filter(
+                models.Q(pk__in=latest_versions.values("version")) |
+                models.Q(pk__in=untracked_versions.order_by().values("object_id").annotate(
+                    latest_pk=models.Max("pk"),
+                ).values("latest_pk"))
+            )
+        return versions.filter(pk__in=versions.order_by().values("object_id").annotate(
+            latest_pk=models.Max("pk"),
+        ).values("latest_pk"))
+
+    def as_of(self, model, when, model_db=None, chunk_size=2000):
+        """
+        Returns an iterator of the instances of the given model as they were at the given date and time.
+
+        The latest version of each object created by then is loaded in a single streamed query. Objects of models
+        registered with ``tombstones=True`` are excluded if they were deleted by then.
+        """
+        model_db = model_db or router.db_for_write(model)
+        versions = self.get_for_model(model, model_db=model_db).filter(revision__date_created__lte=when)
+        versions = versions.filter(pk__in=versions.order_by().values("object_id").annotate(
+            latest_pk=models.Max("pk"),
+        ).values("latest_pk"))
+        if self._has_tombstones(model):
+            versions = versions.exclude(object_id__in=Tombstone.objects.using(self.db).filter(
+                content_type=_get_content_type(model, self.db),
+                db=model_db,
+                deleted_at__lte=when,
+            ).values("object_id"))
+        return self._iter_as_of(versions.select_related("payload").iterator(chunk_size=chunk_size), chunk_size)
+
+    def _iter_as_of(self, versions, chunk_size):
+        while True:
+            chunk = list(islice(versions, chunk_size))
+            if not chunk:
+                break
+            # The delta-encoded versions in each chunk load their keyframes together.
+            _share_keyframes(chunk)
+            for version in chunk:
+                yield version._object_version.object
+
     def get_deleted(self, model, model_db=None):
         model_db = model_db or router.db_for_write(model)
+        if self._has_tombstones(model):
+            # Deleted objects are recorded as they are deleted, so don't need to be found by an anti-join.
+            return self.get_for_model(model, model_db=model_db).filter(pk__in=Tombstone.objects.using(self.db).filter(
+                content_type=_get_content_type(model, self.db),
+                db=model_db,
+            ).values("version"))
+        return self._get_deleted_by_anti_join(model, model_db)
+
+    def _has_tombstones(self, model):
+        # Tombstones only point at versions in the database they are recorded in.
+        return _get_options(model).tombstones and self.db == router.db_for_write(Tombstone)
+
+    def _get_deleted_by_anti_join(self, model, model_db):
         connection = connections[self.db]
-        if self.db == model_db and connection.vendor in ("sqlite", "postgresql", "oracle"):
+        if self.db == model_db and connection.vendor in ("sqlite", "postgresql", "oracle", "mysql"):
             pk_field_name = model._meta.pk.name
             object_id_cast_target = model._meta.get_field(pk_field_name)
             if django.VERSION >= (2, 1):
@@ -187,27 +497,99 @@ class VersionQuerySet(models.QuerySet):
                     .values("latest_pk")
                 )
         else:
-            # We have to use a slow subquery.
-            subquery = self.get_for_model(model, model_db=model_db).exclude(
-                object_id__in=list(
-                    model._default_manager.using(model_db).values_list("pk", flat=True).order_by().iterator()
-                ),
-            ).values_list("object_id").annotate(
-                latest_pk=models.Max("pk")
-            ).order_by().values_list("latest_pk", flat=True)
+            # The model table can't be joined against, so check which objects still exist in chunks. The versions of
+            # the deleted objects are then loaded in chunks too.
+            return self.get_for_model(model, model_db=model_db).filter(
+                _ChunkedIn(models.F("pk"), list(self._iter_deleted_pks(model, model_db))),
+            )
         # Perform the subquery.
         # Filter by model to reduce query execution time.
         return self.get_for_model(model, model_db=model_db).filter(pk__in=subquery)
 
+    def _iter_deleted_pks(self, model, model_db):
+        """Yields the latest version pk of each deleted object, without loading every live pk at once."""
+        pk_field = model._meta.pk
+        live_objects = model._default_manager.using(model_db).order_by()
+        chunk_size = min(_get_chunk_size(self.db), _get_chunk_size(model_db))
+        latest_pks = (
+            self.get_for_model(model, model_db=model_db)
+            .values("object_id")
+            .annotate(latest_pk=models.Max("pk"))
+            .values_list("object_id", "latest_pk")
+            .order_by("object_id")
+        )
+        chunk = []
+        while True:
+            # Page through the objects by object id, since not every database streams query results.
+            if chunk:
+                chunk = list(latest_pks.filter(object_id__gt=chunk[-1][0])[:chunk_size])
+            else:
+                chunk = list(latest_pks[:chunk_size])
+            if not chunk:
+                break
+            latest_pks_by_object_pk = defaultdict(list)
+            for object_id, latest_pk in chunk:
+                try:
+                    latest_pks_by_object_pk[pk_field.to_python(object_id)].append(latest_pk)
+                except ValidationError:
+                    # An object id that isn't a valid pk can't belong to a live object.
+                    yield latest_pk
+            for object_pk in live_objects.filter(pk__in=latest_pks_by_object_pk).values_list("pk", flat=True):
+                latest_pks_by_object_pk.pop(object_pk, None)
+            for deleted_pks in latest_pks_by_object_pk.values():
+                yield from deleted_pks
+
+    def _get_field_key(self, field_name):
+        return "serialized_json__pk" if field_name == "pk" else f"serialized_json__fields__{field_name}"
+
+    def filter_field(self, field_name, value, lookup="exact"):
+        return self.filter(**{f"{self._get_field_key(field_name)}__{lookup}": value})
+
+    def values_field(self, field_name):
+        return self.values_list(self._get_field_key(field_name), flat=True)
+
+    def get_field_changes(self, field_name):
+        return self.filter(field_changes__field_name=field_name)
+
     def get_unique(self):
+        last_version = None
         last_key = None
         for version in self.iterator():
+            # Versions of the same object sharing a deduplicated payload are identical.
+            if (
+                last_version is not None and
+                version.payload_id is not None and
+                version.payload_id == last_version.payload_id and
+                (version.object_id, version.content_type_id, version.db) == last_key[:3]
+            ):
+                continue
             key = (version.object_id, version.content_type_id, version.db, version._local_field_dict)
             if last_key != key:
                 yield version
+            last_version = version
             last_key = key
 
 
+class VersionPayload(models.Model):
+
+    """Serialized data shared by identical versions."""
+
+    hash = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="The SHA-256 hash of the serialized data.",
+    )
+
+    serialized_data = models.TextField(
+        help_text="The serialized form of the versions sharing this payload.",
+    )
+
+    class Meta:
+        verbose_name = _('version payload')
+        verbose_name_plural = _('version payloads')
+        app_label = 'reversion'
+
+
 class Version(models.Model):
 
     """A saved version of a database model."""
@@ -259,18 +641,85 @@ class Version(models.Model):
         help_text="The serialized form of this version of the model.",
     )
 
+    serialized_json = models.JSONField(
+        blank=True,
+        null=True,
+        encoder=DjangoJSONEncoder,
+        help_text="The serialized form of this version of the model, if stored as JSON.",
+    )
+
+    payload = models.ForeignKey(
+        VersionPayload,
+        blank=True,
+        null=True,
+        on_delete=models.PROTECT,
+        help_text="The shared serialized data of this version, if deduplicated.",
+    )
+
+    keyframe = models.ForeignKey(
+        "self",
+        blank=True,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        help_text="The version this version is delta-encoded against, if delta-encoded.",
+    )
+
     object_repr = models.TextField(
         help_text="A string representation of the object.",
     )
 
+    def _get_cache_key(self, kind):
+        # Versions are keyed by a checksum of their data as well as their primary key, in case primary keys are reused.
+        if self.serialized_json is not None:
+            data = json.dumps(self.serialized_json, cls=DjangoJSONEncoder, sort_keys=True)
+        elif self.payload_id is not None:
+            data = self.payload.hash
+        else:
+            data = self.serialized_data
+        return "{prefix}reversion.version.{db}.{pk}.{format}.{checksum:x}.{payload_id}.{kind}".format(
+            prefix=getattr(settings, "REVERSION_CACHE_KEY_PREFIX", ""),
+            db=self._state.db,
+            pk=self.pk,
+            format=self.format,
+            checksum=zlib.crc32(data.encode("utf8")),
+            payload_id=self.payload_id,
+            kind=kind,
+        )
+
     @cached_property
     def _object_version(self):
+        cache = get_cache()
+        if cache is None or self.pk is None:
+            return self._load_object_version()
+        cache_key = self._get_cache_key("object")
+        cached = cache.get(cache_key)
+        if cached is None:
+            object_version = self._load_object_version()
+            cache.set(cache_key, (copy.copy(object_version.object), copy.deepcopy(object_version.m2m_data)))
+            return object_version
+        # The cached object is copied, since it will be modified if the version is reverted.
+        obj, m2m_data = cached
+        return DeserializedObject(copy.copy(obj), m2m_data=copy.deepcopy(m2m_data))
+
+    def _load_object_version(self):
         version_options = _get_options(self._model)
-        data = self.serialized_data
-        data = force_str(data.encode("utf8"))
+        if not version_options.use_natural_foreign_keys:
+            object_version = self._load_object_version_compiled()
+            if object_version is not None:
+                return object_version
         try:
-            return list(serializers.deserialize(self.format, data, ignorenonexistent=True,
-                        use_natural_foreign_keys=version_options.use_natural_foreign_keys))[0]
+            # Compressed and delta-encoded data is tagged in the format, e.g. "json+delta+zlib".
+            format, data = _decode_version_data(self)
+            if isinstance(data, str):
+                data = force_str(data.encode("utf8"))
+            deserializer_options = {}
+            if serializers.get_deserializer(format) is CompactDeserializer:
+                deserializer_options["model"] = self._model
+            return list(serializers.deserialize(format, data, ignorenonexistent=True,
+                        use_natural_foreign_keys=version_options.use_natural_foreign_keys,
+                        **deserializer_options))[0]
         except DeserializationError:
             raise RevertError(gettext("Could not load %(object_repr)s version - incompatible version data.") % {
                 "object_repr": self.object_repr,
@@ -281,6 +730,86 @@ class Version(models.Model):
                 "format": self.format,
             })
 
+    def _load_object_version_compiled(self):
+        # Builds the object version directly from the stored data, or returns None to use the python deserializer.
+        raw_object = self._raw_object
+        if raw_object is None:
+            return None
+        if "model" in raw_object:
+            try:
+                model = apps.get_model(raw_object["model"])
+            except (LookupError, TypeError, ValueError):
+                return None
+        else:
+            model = self._model
+        deserialize = _get_deserializer(model)
+        if deserialize is None:
+            return None
+        return deserialize(raw_object)
+
+    @cached_property
+    def _raw_object(self):
+        """
+        The stored data of this version in the python serializer structure, without deserializing it.
+
+        This is None if the serialization format can't be read without deserializing.
+        """
+        try:
+            format, data = _decode_version_data(self)
+            if format == "python":
+                return data[0]
+            if format == "json":
+                return json.loads(data)[0]
+            if serializers.get_deserializer(format) is CompactDeserializer:
+                fields = json.loads(data)[0]
+                return {"pk": fields.pop("pk", None), "fields": fields}
+        except (DeserializationError, ValueError, IndexError, KeyError):
+            raise RevertError(gettext("Could not load %(object_repr)s version - incompatible version data.") % {
+                "object_repr": self.object_repr,
+            })
+        except serializers.SerializerDoesNotExist:
+            raise RevertError(gettext("Could not load %(object_repr)s version - unknown serializer %(format)s.") % {
+                "object_repr": self.object_repr,
+                "format": self.format,
+            })
+        return None
+
+    def get_field(self, field_name):
+        """
+        Returns the value of a single field in this version of the model.
+
+        For JSON-based formats, only the requested field is converted, without deserializing the whole model.
+        """
+        model = self._model
+        version_options = _get_options(model)
+        field = model._meta.get_field(field_name)
+        # Reverse relations are never serialized.
+        if not isinstance(field, models.Field):
+            raise KeyError(field_name)
+        raw_object = None
+        # Fields of parent models, and natural keys, need the full field dict.
+        if field.model is model._meta.concrete_model and not version_options.use_natural_foreign_keys:
+            raw_object = self._raw_object
+        if raw_object is None:
+            return self.field_dict[field.attname]
+        if field.name not in version_options.fields:
+            raise KeyError(field.attname)
+        # Fields added to the model after the version was saved take their default value in the field dict.
+        if not field.primary_key and field.name not in raw_object["fields"]:
+            return self.field_dict[field.attname]
+        if field.primary_key:
+            value = raw_object["pk"]
+        else:
+            value = raw_object["fields"][field.name]
+        # Convert the value in the same way as the python deserializer.
+        if field.many_to_many:
+            return [field.remote_field.model._meta.pk.to_python(pk) for pk in value]
+        if field.many_to_one or field.one_to_one:
+            if value is None:
+                return None
+            return field.remote_field.model._meta.get_field(field.remote_field.field_name).to_python(value)
+        return field.to_python(value)
+
     @cached_property
     def _local_field_dict(self):
         """
@@ -289,6 +818,19 @@ class Version(models.Model):
 
         Parent links of inherited multi-table models will not be followed.
         """
+        cache = get_cache()
+        if cache is None or self.pk is None:
+            return self._load_local_field_dict()
+        cache_key = self._get_cache_key("fields")
+        field_dict = cache.get(cache_key)
+        if field_dict is None:
+            field_dict = self._load_local_field_dict()
+            cache.set(cache_key, copy.deepcopy(field_dict))
+            return field_dict
+        # The cached field dict is copied, since field_dict adds parent fields to it.
+        return copy.deepcopy(field_dict)
+
+    def _load_local_field_dict(self):
         version_options = _get_options(self._model)
         object_version = self._object_version
         obj = object_version.object
@@ -346,6 +888,121 @@ class Version(models.Model):
         ordering = ("-pk",)
 
 
+class VersionFieldChange(models.Model):
+
+    """A field that changed in a version, compared to the previous version of the same object."""
+
+    version = models.ForeignKey(
+        Version,
+        on_delete=models.CASCADE,
+        related_name="field_changes",
+        help_text="The version in which the field changed.",
+    )
+
+    field_name = models.CharField(
+        max_length=191,
+        help_text="The name of the changed field.",
+    )
+
+    class Meta:
+        verbose_name = _('version field change')
+        verbose_name_plural = _('version field changes')
+        app_label = 'reversion'
+        indexes = (
+            models.Index(
+                fields=["field_name", "version"]
+            ),
+        )
+
+    def __str__(self):
+        return self.field_name
+
+
+class LatestVersion(models.Model):
+
+    """A pointer to the latest version of an object, for models registered with ``track_latest=True``."""
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        help_text="Content type of the model under version control.",
+    )
+
+    object_id = models.CharField(
+        max_length=191,
+        help_text="Primary key of the model under version control.",
+    )
+
+    db = models.CharField(
+        max_length=191,
+        help_text="The database the model under version control is stored in.",
+    )
+
+    version = models.ForeignKey(
+        Version,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="The latest version of the model.",
+    )
+
+    class Meta:
+        verbose_name = _('latest version')
+        verbose_name_plural = _('latest versions')
+        app_label = 'reversion'
+        unique_together = (
+            ("content_type", "db", "object_id"),
+        )
+
+    def __str__(self):
+        return self.object_id
+
+
+class Tombstone(models.Model):
+
+    """A record of a deleted model instance, for models registered with ``tombstones=True``."""
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        help_text="Content type of the deleted model.",
+    )
+
+    object_id = models.CharField(
+        max_length=191,
+        help_text="Primary key of the deleted model.",
+    )
+
+    db = models.CharField(
+        max_length=191,
+        help_text="The database the model was deleted from.",
+    )
+
+    version = models.ForeignKey(
+        Version,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="The latest version of the deleted model.",
+    )
+
+    deleted_at = models.DateTimeField(
+        db_index=True,
+        verbose_name=_("deleted at"),
+        help_text="The date and time this model was deleted.",
+    )
+
+    class Meta:
+        verbose_name = _('tombstone')
+        verbose_name_plural = _('tombstones')
+        app_label = 'reversion'
+        unique_together = (
+            ("content_type", "db", "object_id"),
+        )
+        ordering = ("-pk",)
+
+    def __str__(self):
+        return self.object_id
+
+
 class _Str(models.Func):
 
     """Casts a value to the database's text type."""
@@ -1,16 +1,33 @@
+import base64
+import copy
+import hashlib
+import json
+import lzma
+import threading
+import zlib
 from contextvars import ContextVar
 from collections import namedtuple, defaultdict
 from contextlib import contextmanager
 from functools import wraps
+from itertools import islice
 from django.apps import apps
 from django.core import serializers
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder, Serializer as JSONSerializer
+from django.core.serializers.python import Serializer as PythonSerializer
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.serializers.base import DeserializationError, DeserializedObject
 from django.db import models, transaction, router, connections
-from django.db.models.query import QuerySet
-from django.db.models.signals import post_save, m2m_changed
-from django.utils.encoding import force_str
+from django.db.models.lookups import In
+try:
+    from django.db.models import CompositePrimaryKey as _CompositePrimaryKey
+except ImportError:  # Django < 5.2.
+    _CompositePrimaryKey = None
+from django.db.models.query import QuerySet, prefetch_related_objects
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.utils.encoding import force_str, is_protected_type
 from django.utils import timezone
-from reversion.errors import RevisionManagementError, RegistrationError
+from reversion.errors import RevertError, RevisionManagementError, RegistrationError
+from reversion.serializers import Serializer as CompactSerializer, _dump_objects
 from reversion.signals import pre_revision_commit, post_revision_commit
 
 
@@ -21,6 +38,12 @@ _VersionOptions = namedtuple("VersionOptions", (
     "for_concrete_model",
     "ignore_duplicates",
     "use_natural_foreign_keys",
+    "compression",
+    "keyframe_interval",
+    "deduplicate",
+    "track_changes",
+    "tombstones",
+    "track_latest",
 ))
 
 
@@ -31,9 +54,49 @@ _StackFrame = namedtuple("StackFrame", (
     "date_created",
     "db_versions",
     "meta",
+    "journal",
+    "defer",
+    "stream",
+    "has_tombstones",
 ))
 
 
+_RevisionStream = namedtuple("RevisionStream", (
+    "using",
+    "batch_size",
+    "revision",
+    "flushed_keys",
+))
+
+
+# Compression codecs for serialized data, as (compress, decompress) pairs.
+_COMPRESSION = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+# Versions in the python serialization format are stored in Version.serialized_json, rather than as text.
+_JSON_STORAGE_FORMAT = "python"
+
+
+# Serialization formats that support delta encoding.
+_DELTA_FORMATS = ("json", "compact_json")
+
+
+_DELTA = "delta"
+
+
+_VersionReference = namedtuple("VersionReference", (
+    "model",
+    "object_id",
+    "model_db",
+))
+
+
+_MISSING = object()
+
+
 _stack = ContextVar("reversion-stack", default=[])
 
 
@@ -47,22 +110,20 @@ def _current_frame():
     return _stack.get()[-1]
 
 
-def _copy_db_versions(db_versions):
-    return {
-        db: versions.copy()
-        for db, versions
-        in db_versions.items()
-    }
-
-
-def _push_frame(manage_manually, using):
+def _push_frame(manage_manually, using, defer, batch_size):
+    from reversion.models import Revision
+    if not _signals_connected:
+        _connect_registered_signals()
     if is_active():
         current_frame = _current_frame()
-        db_versions = _copy_db_versions(current_frame.db_versions)
+        # Nested frames share the version dicts of their parent, and journal their changes so they can be undone.
+        db_versions = current_frame.db_versions.copy()
         db_versions.setdefault(using, {})
         stack_frame = current_frame._replace(
             manage_manually=manage_manually,
             db_versions=db_versions,
+            journal=[],
+            defer=defer,
         )
     else:
         stack_frame = _StackFrame(
@@ -72,6 +133,15 @@ def _push_frame(manage_manually, using):
             date_created=timezone.now(),
             db_versions={using: {}},
             meta=(),
+            journal=None,
+            defer=defer,
+            stream=_RevisionStream(
+                using=using,
+                batch_size=batch_size,
+                revision=Revision(),
+                flushed_keys=set(),
+            ) if batch_size else None,
+            has_tombstones={},
         )
     _stack.set(_stack.get() + [stack_frame])
 
@@ -80,24 +150,34 @@ def _update_frame(**kwargs):
     _stack.get()[-1] = _current_frame()._replace(**kwargs)
 
 
-def _pop_frame():
+def _pop_frame(commit):
     prev_frame = _current_frame()
     stack = _stack.get()
     del stack[-1]
-    if is_active():
-        current_frame = _current_frame()
-        db_versions = {
-            db: prev_frame.db_versions[db]
-            for db
-            in current_frame.db_versions.keys()
-        }
-        _update_frame(
-            user=prev_frame.user,
-            comment=prev_frame.comment,
-            date_created=prev_frame.date_created,
-            db_versions=db_versions,
-            meta=prev_frame.meta,
-        )
+    if commit:
+        if is_active():
+            current_frame = _current_frame()
+            if current_frame.journal is not None:
+                current_frame.journal.extend(prev_frame.journal)
+            _update_frame(
+                user=prev_frame.user,
+                comment=prev_frame.comment,
+                date_created=prev_frame.date_created,
+                meta=prev_frame.meta,
+            )
+    elif prev_frame.journal is not None:
+        # Undo all changes made to the shared version dicts by the discarded frame.
+        for versions, version_key, prev_version in reversed(prev_frame.journal):
+            if prev_version is _MISSING:
+                del versions[version_key]
+            else:
+                versions[version_key] = prev_version
+
+
+def _set_version(frame, versions, version_key, version):
+    if frame.journal is not None:
+        frame.journal.append((versions, version_key, versions.get(version_key, _MISSING)))
+    versions[version_key] = version
 
 
 def is_manage_manually():
@@ -132,86 +212,547 @@ def add_meta(model, **values):
     _update_frame(meta=_current_frame().meta + ((model, values),))
 
 
-def _follow_relations(obj):
-    version_options = _get_options(obj.__class__)
-    for follow_name in version_options.follow:
-        try:
-            follow_obj = getattr(obj, follow_name)
-        except ObjectDoesNotExist:
+def _follow_relations(objs):
+    """Yields (obj, follow_obj) for each object followed from the given objects."""
+    # Group the objects by model, so each relation can be prefetched in a single query.
+    model_objs = defaultdict(list)
+    for obj in objs:
+        model_objs[obj.__class__].append(obj)
+    for model, objs in model_objs.items():
+        version_options = _get_options(model)
+        if not version_options.follow:
             continue
-        if isinstance(follow_obj, models.Model):
-            yield follow_obj
-        elif isinstance(follow_obj, (models.Manager, QuerySet)):
-            yield from follow_obj.all()
-        elif follow_obj is not None:
-            raise RegistrationError("{name}.{follow_name} should be a Model or QuerySet".format(
-                name=obj.__class__.__name__,
-                follow_name=follow_name,
-            ))
-
-
-def _follow_relations_recursive(obj):
-    def do_follow(obj):
-        if obj not in relations:
-            relations.add(obj)
-            for related in _follow_relations(obj):
-                do_follow(related)
+        # Prefetch onto copies of the objects, so the caller's instances are left untouched.
+        copied_objs = [_copy_for_prefetch(obj) for obj in objs]
+        for follow_name in version_options.follow:
+            try:
+                prefetch_related_objects(copied_objs, follow_name)
+            except (AttributeError, ValueError, ObjectDoesNotExist):
+                # Not a prefetchable relation (e.g. a property), so it will be loaded for each object.
+                pass
+        for obj, copied_obj in zip(objs, copied_objs):
+            for follow_name in version_options.follow:
+                try:
+                    follow_obj = getattr(copied_obj, follow_name)
+                except ObjectDoesNotExist:
+                    continue
+                if isinstance(follow_obj, models.Model):
+                    yield obj, follow_obj
+                elif isinstance(follow_obj, (models.Manager, QuerySet)):
+                    for related_obj in follow_obj.all():
+                        yield obj, related_obj
+                elif follow_obj is not None:
+                    raise RegistrationError("{name}.{follow_name} should be a Model or QuerySet".format(
+                        name=obj.__class__.__name__,
+                        follow_name=follow_name,
+                    ))
+
+
+def _copy_for_prefetch(obj):
+    obj = copy.copy(obj)
+    if hasattr(obj, "_prefetched_objects_cache"):
+        obj._prefetched_objects_cache = obj._prefetched_objects_cache.copy()
+    return obj
+
+
+def _follow_relations_recursive(objs):
     relations = set()
-    do_follow(obj)
+    objs = set(objs)
+    while objs:
+        relations.update(objs)
+        objs = {follow_obj for _, follow_obj in _follow_relations(objs)} - relations
     return relations
 
 
-def _add_to_revision(obj, using, model_db, explicit):
+def _get_field_value_getter(field):
+    # Equivalent to the python serializer's _value_from_field().
+    value_from_object = field.value_from_object
+    value_to_string = field.value_to_string
+
+    def get_value(obj):
+        value = value_from_object(obj)
+        return value if is_protected_type(value) else value_to_string(obj)
+
+    return get_value
+
+
+def _get_natural_key_getter(field):
+    field_name = field.name
+
+    def get_value(obj):
+        related = getattr(obj, field_name)
+        return related.natural_key() if related else None
+
+    return get_value
+
+
+def _get_m2m_getter(field, use_natural_foreign_keys):
+    field_name = field.name
+    if use_natural_foreign_keys:
+        def get_related_value(related):
+            return related.natural_key()
+
+        def get_related(obj):
+            related = getattr(obj, field_name)
+            return related.iterator(2000 if getattr(related, "prefetch_cache_name", None) else None)
+    else:
+        get_related_value = _get_field_value_getter(field.remote_field.model._meta.pk)
+
+        def get_related(obj):
+            related = getattr(obj, field_name).select_related(None).only("pk")
+            return related.iterator(chunk_size=2000 if related._prefetch_related_lookups else None)
+
+    def get_value(obj):
+        prefetched = getattr(obj, "_prefetched_objects_cache", {})
+        related_objs = prefetched[field_name] if field_name in prefetched else get_related(obj)
+        return [get_related_value(related) for related in related_objs]
+
+    return get_value
+
+
+def _compile_serializer(model, version_options):
+    """
+    Returns a function that serializes an instance of the given model into the python serializer structure.
+
+    The field selection is resolved once, rather than for every serialized object.
+    """
+    opts = model._meta.concrete_model._meta
+    if _CompositePrimaryKey is not None and isinstance(opts.pk, _CompositePrimaryKey):
+        return None
+    selected_fields = version_options.fields
+    use_natural_foreign_keys = version_options.use_natural_foreign_keys
+    field_getters = []
+    for field in opts.local_fields:
+        if not field.serialize:
+            continue
+        if field.remote_field is None:
+            if field.attname in selected_fields:
+                field_getters.append((field.name, _get_field_value_getter(field)))
+        elif field.attname[:-3] in selected_fields:
+            if use_natural_foreign_keys and hasattr(field.remote_field.model, "natural_key"):
+                field_getters.append((field.name, _get_natural_key_getter(field)))
+            else:
+                field_getters.append((field.name, _get_field_value_getter(field)))
+    for field in opts.local_many_to_many:
+        if field.serialize and field.attname in selected_fields and field.remote_field.through._meta.auto_created:
+            field_getters.append((field.name, _get_m2m_getter(
+                field,
+                use_natural_foreign_keys and hasattr(field.remote_field.model, "natural_key"),
+            )))
+    model_label = str(model._meta)
+    get_pk = _get_field_value_getter(model._meta.pk)
+
+    def serialize(obj):
+        return {
+            "model": model_label,
+            "pk": get_pk(obj),
+            "fields": {field_name: get_value(obj) for field_name, get_value in field_getters},
+        }
+
+    return serialize
+
+
+def _get_serializer(model):
+    try:
+        return _model_serializers[model]
+    except KeyError:
+        serializer = _model_serializers[model] = _compile_serializer(model, _get_options(model))
+        return serializer
+
+
+class _NaturalKeyValue(Exception):
+
+    """Raised by a compiled deserializer for values that need a natural key lookup."""
+
+
+def _get_fk_converter(field):
+    # Equivalent to the python deserializer's deserialize_fk_value(), without natural keys.
+    related_model = field.remote_field.model
+    to_python = related_model._meta.get_field(field.remote_field.field_name).to_python
+    has_natural_key = hasattr(related_model._default_manager, "get_by_natural_key")
+
+    def convert(value):
+        if value is None:
+            return None
+        if has_natural_key and hasattr(value, "__iter__") and not isinstance(value, str):
+            raise _NaturalKeyValue
+        return to_python(value)
+
+    return convert
+
+
+def _get_m2m_converter(field):
+    # Equivalent to the python deserializer's deserialize_m2m_values(), without natural keys.
+    related_model = field.remote_field.model
+    to_python = related_model._meta.pk.to_python
+    has_natural_key = hasattr(related_model._default_manager, "get_by_natural_key")
+
+    def convert(values):
+        if has_natural_key and any(hasattr(value, "__iter__") and not isinstance(value, str) for value in values):
+            raise _NaturalKeyValue
+        return [to_python(value) for value in values]
+
+    return convert
+
+
+def _compile_deserializer(model):
+    """
+    Returns a function that builds a DeserializedObject for the given model from the python serializer structure.
+
+    The field conversions are resolved once, rather than for every deserialized object. The function returns None
+    for data it can't handle, such as natural keys, so the caller can fall back to the python deserializer.
+    """
+    opts = model._meta
+    if _CompositePrimaryKey is not None and isinstance(opts.pk, _CompositePrimaryKey):
+        return None
+    pk_attname = opts.pk.attname
+    pk_to_python = opts.pk.to_python
+    has_natural_key = hasattr(opts.default_manager, "get_by_natural_key") and hasattr(model, "natural_key")
+    converters = {}
+    for field in opts.get_fields():
+        if not isinstance(field, models.Field) or not (field.concrete or field.many_to_many):
+            continue
+        if isinstance(field.remote_field, models.ManyToManyRel):
+            converters[field.name] = (True, field.name, _get_m2m_converter(field))
+        elif isinstance(field.remote_field, models.ManyToOneRel):
+            converters[field.name] = (False, field.attname, _get_fk_converter(field))
+        else:
+            converters[field.name] = (False, field.name, field.to_python)
+
+    def deserialize(raw_object):
+        data = {}
+        m2m_data = {}
+        try:
+            if "pk" in raw_object:
+                data[pk_attname] = pk_to_python(raw_object["pk"])
+            for field_name, value in raw_object["fields"].items():
+                try:
+                    is_m2m, key, convert = converters[field_name]
+                except KeyError:
+                    # Fields removed from the model since the version was saved are ignored.
+                    continue
+                (m2m_data if is_m2m else data)[key] = convert(value)
+        except (_NaturalKeyValue, ValidationError, ValueError, TypeError):
+            # The python deserializer looks up natural keys, and reports errors.
+            return None
+        # Without a primary key, the python deserializer looks the object up by its natural key.
+        if data.get(pk_attname) is None and has_natural_key:
+            return None
+        return DeserializedObject(model(**data), m2m_data)
+
+    return deserialize
+
+
+def _get_deserializer(model):
+    try:
+        return _model_deserializers[model]
+    except KeyError:
+        deserializer = _model_deserializers[model] = _compile_deserializer(model)
+        return deserializer
+
+
+def _get_m2m_prefetches(model, version_options):
+    """Returns the prefetches for the many-to-many fields serialized for the given model."""
+    prefetches = []
+    selected_fields = version_options.fields
+    for field in model._meta.concrete_model._meta.local_many_to_many:
+        if field.serialize and field.attname in selected_fields and field.remote_field.through._meta.auto_created:
+            related_model = field.remote_field.model
+            if version_options.use_natural_foreign_keys and hasattr(related_model, "natural_key"):
+                prefetches.append(field.name)
+            else:
+                # Only the related pks are serialized.
+                prefetches.append(models.Prefetch(field.name, queryset=related_model._default_manager.only("pk")))
+    return prefetches
+
+
+def _prefetch_m2m(model, objs, version_options):
+    prefetches = _get_m2m_prefetches(model, version_options)
+    if not prefetches or not objs:
+        return objs
+    # Prefetch onto copies of the objects, so the caller's instances are left untouched.
+    objs = [_copy_for_prefetch(obj) for obj in objs]
+    chunk_size = _get_chunk_size(objs[0]._state.db or router.db_for_read(model))
+    for i in range(0, len(objs), chunk_size):
+        prefetch_related_objects(objs[i:i + chunk_size], *prefetches)
+    return objs
+
+
+def _serialize_objs(model, objs, version_options):
+    """Serializes each of the given model instances into a separate string, using a single serializer pass."""
+    objs = _prefetch_m2m(model, list(objs), version_options)
+    serializer_options = {
+        "fields": version_options.fields,
+        "use_natural_foreign_keys": version_options.use_natural_foreign_keys,
+    }
+    serializer = serializers.get_serializer(version_options.format)
+    if serializer in (PythonSerializer, JSONSerializer, CompactSerializer):
+        compiled_serializer = _get_serializer(model)
+        if compiled_serializer is None:
+            objs = serializers.serialize("python", objs, **serializer_options)
+        else:
+            objs = [compiled_serializer(obj) for obj in objs]
+    if serializer is PythonSerializer:
+        return objs
+    if serializer is JSONSerializer:
+        # The json serializer output for a single object is just the python serializer output, JSON encoded.
+        return [
+            "[{data}]".format(data=json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False))
+            for data in objs
+        ]
+    if serializer is CompactSerializer:
+        return [
+            _dump_objects((data,))
+            for data in objs
+        ]
+    return [
+        serializers.serialize(version_options.format, (obj,), **serializer_options)
+        for obj in objs
+    ]
+
+
+def _add_to_revision(objs, using, model_db, explicit, defer, sources=None):
+    """
+    Adds versions of the given objects to the current revision, following their relations.
+
+    For followed objects, ``sources`` gives the version key of the object each one was followed from.
+    """
     from reversion.models import Version
-    # Exit early if the object is not fully-formed.
-    if obj.pk is None:
-        return
-    version_options = _get_options(obj.__class__)
-    content_type = _get_content_type(obj.__class__, using)
-    object_id = force_str(obj.pk)
-    version_key = (content_type, object_id)
-    # If the obj is already in the revision, stop now.
-    db_versions = _current_frame().db_versions
-    versions = db_versions[using]
-    if version_key in versions and not explicit:
-        return
-    # Get the version data.
-    version = Version(
-        content_type=content_type,
-        object_id=object_id,
-        db=model_db,
-        format=version_options.format,
-        serialized_data=serializers.serialize(
-            version_options.format,
-            (obj,),
-            fields=version_options.fields,
-            use_natural_foreign_keys=version_options.use_natural_foreign_keys,
-        ),
-        object_repr=force_str(obj),
-    )
-    # If the version is a duplicate, stop now.
-    if version_options.ignore_duplicates and explicit:
-        previous_version = Version.objects.using(using).get_for_object(obj, model_db=model_db).first()
-        if previous_version and previous_version._local_field_dict == version._local_field_dict:
-            return
-    # Store the version.
-    db_versions = _copy_db_versions(db_versions)
-    db_versions[using][version_key] = version
-    _update_frame(db_versions=db_versions)
-    # Follow relations.
-    for follow_obj in _follow_relations(obj):
-        _add_to_revision(follow_obj, using, model_db, False)
+    frame = _current_frame()
+    versions = frame.db_versions[using]
+    # Group the objects by model, skipping objects that are not fully-formed.
+    model_objs = defaultdict(dict)
+    obj_sources = defaultdict(set)
+    for obj, source in zip(objs, sources or [None] * len(objs)):
+        if obj.pk is not None:
+            object_id = force_str(obj.pk)
+            model_objs[obj.__class__][object_id] = obj
+            if source is not None:
+                obj_sources[(obj.__class__, object_id)].add(source)
+    added_objs = []
+    added_keys = {}
+    for model, objs_by_id in model_objs.items():
+        version_options = _get_options(model)
+        content_type = _get_content_type(model, using)
+        # If deferred, just store a reference to the obj, to be serialized when the revision is saved.
+        if defer:
+            for object_id in objs_by_id.keys():
+                _set_version(frame, versions, (content_type, object_id), _VersionReference(
+                    model=model,
+                    object_id=object_id,
+                    model_db=model_db,
+                ))
+            continue
+        # If the obj is already in the revision, skip it, but remember that it was followed from its sources, so it
+        # can be kept if a source is kept.
+        if not explicit:
+            new_objs_by_id = {}
+            for object_id, obj in objs_by_id.items():
+                version = versions.get((content_type, object_id))
+                if isinstance(version, Version):
+                    version._followed_from.update(obj_sources[(model, object_id)])
+                elif not (frame.stream and (content_type, object_id) in frame.stream.flushed_keys):
+                    new_objs_by_id[object_id] = obj
+            objs_by_id = new_objs_by_id
+        # Get the version data.
+        for (object_id, obj), serialized_data in zip(
+            objs_by_id.items(),
+            _serialize_objs(model, objs_by_id.values(), version_options),
+        ):
+            version = Version(
+                content_type=content_type,
+                object_id=object_id,
+                db=model_db,
+                format=version_options.format,
+                object_repr=force_str(obj),
+            )
+            if version_options.format == _JSON_STORAGE_FORMAT:
+                version.serialized_json = serialized_data
+            else:
+                version.serialized_data = serialized_data
+            version._compression = version_options.compression
+            version._keyframe_interval = version_options.keyframe_interval
+            version._deduplicate = version_options.deduplicate
+            version._track_changes = version_options.track_changes
+            version._track_latest = version_options.track_latest
+            # Duplicate versions of explicitly added objects are discarded when the revision is saved, along with the
+            # versions only followed from them.
+            version._explicit = explicit
+            version._ignore_if_duplicate = explicit and version_options.ignore_duplicates
+            version._followed_from = set(obj_sources[(model, object_id)])
+            previous_version = versions.get((content_type, object_id))
+            if isinstance(previous_version, Version):
+                version._followed_from.update(previous_version._followed_from)
+            # Store the version.
+            _set_version(frame, versions, (content_type, object_id), version)
+            added_objs.append(obj)
+            added_keys[id(obj)] = (content_type, object_id)
+    # Follow relations, one level at a time.
+    follow_pairs = list(_follow_relations(added_objs))
+    if follow_pairs:
+        _add_to_revision(
+            [follow_obj for _, follow_obj in follow_pairs],
+            using,
+            model_db,
+            False,
+            False,
+            [added_keys[id(obj)] for obj, _ in follow_pairs],
+        )
 
 
 def add_to_revision(obj, model_db=None):
+    frame = _current_frame()
     model_db = model_db or router.db_for_write(obj.__class__, instance=obj)
-    for db in _current_frame().db_versions.keys():
-        _add_to_revision(obj, db, model_db, True)
+    for db in frame.db_versions.keys():
+        _add_to_revision((obj,), db, model_db, True, frame.defer)
+    _flush_versions(frame, False)
+
+
+def add_to_revision_bulk(objs, model_db=None):
+    frame = _current_frame()
+    # When streaming, add the objects in batches, so they never need to be in memory all at once.
+    if frame.stream:
+        if isinstance(objs, QuerySet):
+            objs = objs.iterator(chunk_size=frame.stream.batch_size)
+        objs = iter(objs)
+        while True:
+            batch = list(islice(objs, frame.stream.batch_size))
+            if not batch:
+                break
+            _add_to_revision_bulk(frame, batch, model_db)
+            _flush_versions(frame, False)
+    else:
+        _add_to_revision_bulk(frame, objs, model_db)
+
+
+def _add_to_revision_bulk(frame, objs, model_db):
+    # Group the objects by the database they are stored in.
+    model_db_objs = defaultdict(list)
+    for obj in objs:
+        model_db_objs[model_db or router.db_for_write(obj.__class__, instance=obj)].append(obj)
+    for db in frame.db_versions.keys():
+        for obj_model_db, objs in model_db_objs.items():
+            _add_to_revision(objs, db, obj_model_db, True, frame.defer)
+
+
+def _add_references_to_revision(using):
+    frame = _current_frame()
+    versions = frame.db_versions[using]
+    # Group the deferred references by database and model.
+    model_db_object_ids = defaultdict(lambda: defaultdict(list))
+    for version_key, version in list(versions.items()):
+        if isinstance(version, _VersionReference):
+            model_db_object_ids[version.model_db][version.model].append(version.object_id)
+            del versions[version_key]
+    # Load and serialize the referenced objects in bulk. Objects that no longer exist are skipped.
+    for model_db, model_object_ids in model_db_object_ids.items():
+        objs = [
+            obj
+            for model, object_ids in model_object_ids.items()
+            for model_objs in _filter_in_chunks(model._base_manager.using(model_db), "pk", object_ids)
+            for obj in model_objs
+        ]
+        _add_to_revision(objs, using, model_db, True, False)
+
+
+class _In(In):
+
+    """An ``in`` lookup that sends its values as a single array parameter on PostgreSQL."""
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        _, rhs_params = self.batch_process_rhs(compiler, connection, self.rhs)
+        return f"{lhs} = ANY(%s)", (*lhs_params, list(rhs_params))
+
+
+class _ChunkedIn(_In):
+
+    """
+    An ``in`` lookup that a ``VersionQuerySet`` loads in chunks, so each query has a bounded number of parameters.
+
+    Queries that can't be split, such as updates, deletes and subqueries, send all the values at once.
+    """
+
+
+def _get_chunk_size(using):
+    connection = connections[using]
+    # PostgreSQL receives each chunk as a single array parameter, so chunks only need to bound the result size.
+    if connection.vendor == "postgresql":
+        return 10000
+    # Leave room for any other query parameters.
+    max_query_params = connection.features.max_query_params
+    return min(max_query_params // 2 if max_query_params else 2000, 2000)
+
+
+def _filter_in_chunks(queryset, field_name, values):
+    """Yields the given queryset filtered to each bounded chunk of the given field values."""
+    opts = queryset.model._meta
+    field = opts.pk if field_name == "pk" else opts.get_field(field_name)
+    # The lookup is built before its F() is resolved, so it can't prepare the values for the field itself.
+    values = [field.get_prep_value(value) for value in values]
+    chunk_size = _get_chunk_size(queryset.db)
+    for i in range(0, len(values), chunk_size):
+        yield queryset.filter(_In(models.F(field_name), values[i:i + chunk_size]))
+
+
+def _get_previous_versions(versions, using):
+    """Yields (version, previous_version) for each of the given versions with a previously saved version."""
+    from reversion.models import LatestVersion, Version
+    # Group the versions by content type and database.
+    model_db_versions = defaultdict(dict)
+    for version in versions:
+        model_db_versions[(version.content_type, version.db)][version.object_id] = version
+    # Load the previous versions of all objects, in a single query per model, database and chunk.
+    for (content_type, db), versions_by_id in model_db_versions.items():
+        object_ids = versions_by_id.keys()
+        if all(version._track_latest for version in versions_by_id.values()):
+            # Objects without a latest version pointer, e.g. versioned before track_latest was enabled, or whose
+            # latest version was deleted, fall back to grouping their version history.
+            found_object_ids = set()
+            for latest_versions in _filter_in_chunks(
+                LatestVersion.objects.using(using).filter(content_type=content_type, db=db),
+                "object_id",
+                object_ids,
+            ):
+                for previous_version in Version.objects.using(using).filter(
+                    pk__in=latest_versions.values("version"),
+                ).select_related("payload"):
+                    found_object_ids.add(previous_version.object_id)
+                    yield versions_by_id[previous_version.object_id], previous_version
+            object_ids = object_ids - found_object_ids
+        for object_versions in _filter_in_chunks(
+            Version.objects.using(using).filter(content_type=content_type, db=db),
+            "object_id",
+            object_ids,
+        ):
+            for previous_version in Version.objects.using(using).filter(
+                pk__in=object_versions.order_by().values("object_id").annotate(
+                    latest_pk=models.Max("pk"),
+                ).values("latest_pk"),
+            ).select_related("payload"):
+                yield versions_by_id[previous_version.object_id], previous_version
+
+
+def _is_duplicate_version(version, previous_version):
+    # Identical deduplicated payloads can be compared by hash, without deserializing them.
+    if previous_version.payload_id is not None and previous_version.format == version.format:
+        if previous_version.payload.hash == _hash_data(version.serialized_data):
+            return True
+    return previous_version._local_field_dict == version._local_field_dict
+
+
+def _get_duplicate_versions(versions, using):
+    return {
+        (version.content_type, version.db, version.object_id)
+        for version, previous_version in _get_previous_versions(
+            [version for version in versions if version._ignore_if_duplicate],
+            using,
+        )
+        if _is_duplicate_version(version, previous_version)
+    }
 
 
-def _save_revision(versions, user=None, comment="", meta=(), date_created=None, using=None):
-    from reversion.models import Revision
-    from reversion.models import Version
+def _filter_versions(versions, using):
     # Only save versions that exist in the database.
     # Use _base_manager so we don't have problems when _default_manager is overriden
     model_db_pks = defaultdict(lambda: defaultdict(set))
@@ -219,10 +760,11 @@ def _save_revision(versions, user=None, comment="", meta=(), date_created=None,
         model_db_pks[version._model][version.db].add(version.object_id)
     model_db_existing_pks = {
         model: {
-            db: frozenset(map(
-                force_str,
-                model._base_manager.using(db).filter(pk__in=pks).values_list("pk", flat=True),
-            ))
+            db: frozenset(
+                force_str(pk)
+                for existing_objs in _filter_in_chunks(model._base_manager.using(db), "pk", pks)
+                for pk in existing_objs.values_list("pk", flat=True)
+            )
             for db, pks in db_pks.items()
         }
         for model, db_pks in model_db_pks.items()
@@ -231,6 +773,393 @@ def _save_revision(versions, user=None, comment="", meta=(), date_created=None,
         version for version in versions
         if version.object_id in model_db_existing_pks[version._model][version.db]
     ]
+    # Discard versions that are identical to the previous version of their object.
+    duplicate_versions = _get_duplicate_versions(versions, using)
+    if duplicate_versions:
+        versions = _discard_duplicate_versions(versions, duplicate_versions)
+    return versions
+
+
+def _discard_duplicate_versions(versions, duplicate_versions):
+    """Discards the duplicate versions, and the versions only followed from discarded versions."""
+    versions_by_key = {(version.content_type, version.object_id): version for version in versions}
+    # Start by discarding every version that might be discarded, then keep versions followed from kept versions,
+    # until nothing changes. This discards cycles of followed versions that are only reachable from duplicates.
+    discarded = {
+        id(version)
+        for version in versions
+        if not version._explicit or (version.content_type, version.db, version.object_id) in duplicate_versions
+    }
+    changed = True
+    while changed:
+        changed = False
+        for version in versions:
+            if id(version) in discarded and any(
+                # Sources that aren't part of this save are kept.
+                id(versions_by_key.get(source)) not in discarded
+                for source in version._followed_from
+            ):
+                discarded.remove(id(version))
+                changed = True
+    return [version for version in versions if id(version) not in discarded]
+
+
+def _compress_version(version, compression):
+    compress = _COMPRESSION[compression][0]
+    serialized_data = base64.b64encode(compress(version.serialized_data.encode("utf8"))).decode("ascii")
+    # Only store the compressed data if it's actually smaller.
+    if len(serialized_data) < len(version.serialized_data):
+        version.format = f"{version.format}+{compression}"
+        version.serialized_data = serialized_data
+
+
+def _decompress(compression, serialized_data):
+    try:
+        decompress = _COMPRESSION[compression][1]
+    except KeyError:
+        raise serializers.SerializerDoesNotExist(compression)
+    try:
+        return decompress(base64.b64decode(serialized_data)).decode("utf8")
+    except (ValueError, zlib.error, lzma.LZMAError) as ex:
+        raise DeserializationError(ex) from ex
+
+
+def _decode_version_data(version, delta=True):
+    """
+    Returns the serialization format and serialized data of the given version, undoing any compression.
+
+    If delta is False, delta-encoded data is returned without resolving it against its keyframe.
+    """
+    if version.serialized_json is not None:
+        return version.format, [version.serialized_json]
+    format, *codecs = version.format.split("+")
+    data = version.payload.serialized_data if version.payload_id is not None else version.serialized_data
+    for codec in reversed(codecs):
+        if codec == _DELTA:
+            if delta:
+                data = _delta_decode(version, format, data)
+        else:
+            data = _decompress(codec, data)
+    return format, data
+
+
+def _json_equal(value, other_value):
+    if type(value) is not type(other_value):
+        return False
+    if isinstance(value, list):
+        return json.dumps(value) == json.dumps(other_value)
+    return value == other_value
+
+
+def _diff(base, data):
+    """Returns the changes needed to turn base into data, or None if they don't have the same keys."""
+    if base.keys() != data.keys():
+        return None
+    delta = {}
+    for key, value in data.items():
+        base_value = base[key]
+        if isinstance(value, dict) and isinstance(base_value, dict):
+            value_delta = _diff(base_value, value)
+            if value_delta is None:
+                return None
+            if value_delta:
+                delta[key] = value_delta
+        elif not _json_equal(value, base_value):
+            delta[key] = value
+    return delta
+
+
+def _patch(base, delta):
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(base[key], dict):
+            _patch(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def _get_keyframe_pk(version):
+    """Returns the pk of the keyframe the given delta-encoded version is stored against, or None if unreadable."""
+    if version.keyframe_id is not None:
+        return version.keyframe_id
+    try:
+        return json.loads(_decode_version_data(version, delta=False)[1])["keyframe"]
+    except (DeserializationError, serializers.SerializerDoesNotExist, ValueError, KeyError, TypeError):
+        return None
+
+
+def _share_keyframes(versions):
+    """Lets the given versions load the keyframes of all delta-encoded versions together, when one is first read."""
+    delta_versions = [version for version in versions if _DELTA in version.format.split("+")]
+    if len(delta_versions) > 1:
+        keyframes = {}
+        for version in delta_versions:
+            version._keyframes = keyframes
+            version._delta_versions = delta_versions
+
+
+def _get_keyframe(version, keyframe_pk):
+    from reversion.models import Version
+    keyframes = getattr(version, "_keyframes", None)
+    if keyframes is None:
+        return Version.objects.using(version._state.db).select_related("payload").get(pk=keyframe_pk)
+    if keyframe_pk not in keyframes:
+        keyframe_pks = {keyframe_pk}
+        keyframe_pks.update(_get_keyframe_pk(delta_version) for delta_version in version._delta_versions)
+        keyframe_pks -= keyframes.keys()
+        keyframe_pks.discard(None)
+        for keyframes_chunk in _filter_in_chunks(
+            Version.objects.using(version._state.db).select_related("payload"),
+            "pk",
+            keyframe_pks,
+        ):
+            keyframes.update((keyframe.pk, keyframe) for keyframe in keyframes_chunk)
+    try:
+        return keyframes[keyframe_pk]
+    except KeyError:
+        raise Version.DoesNotExist(f"Keyframe {keyframe_pk} does not exist")
+
+
+def _delta_decode(version, format, data):
+    from reversion.models import Version
+    try:
+        data = json.loads(data)
+        keyframe = _get_keyframe(version, data["keyframe"])
+    except (ValueError, KeyError, TypeError, Version.DoesNotExist) as ex:
+        raise DeserializationError(ex) from ex
+    keyframe_format, keyframe_data = _decode_version_data(keyframe, delta=False)
+    if keyframe_format != format or _DELTA in keyframe.format.split("+"):
+        raise DeserializationError(f"Version {keyframe.pk} is not a keyframe in the {format} format")
+    keyframe_objs = json.loads(keyframe_data)
+    return json.dumps([_patch(keyframe_objs[0], data["delta"])], ensure_ascii=False)
+
+
+def _delta_encode_versions(versions, using):
+    from reversion.models import Version
+    # Find the keyframe each version should be stored relative to.
+    version_keyframes = []
+    for version, previous_version in _get_previous_versions(
+        [version for version in versions if version._keyframe_interval],
+        using,
+    ):
+        try:
+            format, data = _decode_version_data(previous_version, delta=False)
+            if _DELTA in previous_version.format.split("+"):
+                data = json.loads(data)
+                keyframe_pk, depth = data["keyframe"], data["depth"] + 1
+            else:
+                keyframe_pk, depth = previous_version.pk, 1
+        except (ValueError, KeyError, TypeError, DeserializationError, serializers.SerializerDoesNotExist):
+            continue
+        # Store a full keyframe every keyframe_interval versions.
+        if format == version.format and depth < version._keyframe_interval:
+            version_keyframes.append((version, keyframe_pk, depth))
+    # Load the keyframes.
+    keyframes = {
+        keyframe.pk: keyframe
+        for keyframe_versions in _filter_in_chunks(
+            Version.objects.using(using).select_related("payload"),
+            "pk",
+            {keyframe_pk for _, keyframe_pk, _ in version_keyframes},
+        )
+        for keyframe in keyframe_versions
+    }
+    # Store each version as a delta against its keyframe, if smaller.
+    for version, keyframe_pk, depth in version_keyframes:
+        keyframe = keyframes.get(keyframe_pk)
+        if keyframe is None or _DELTA in keyframe.format.split("+"):
+            continue
+        try:
+            keyframe_format, keyframe_data = _decode_version_data(keyframe)
+            keyframe_objs = json.loads(keyframe_data)
+        except (ValueError, DeserializationError, serializers.SerializerDoesNotExist):
+            continue
+        objs = json.loads(version.serialized_data)
+        if keyframe_format != version.format or len(keyframe_objs) != 1 or len(objs) != 1:
+            continue
+        delta = _diff(keyframe_objs[0], objs[0])
+        if delta is None:
+            continue
+        serialized_data = json.dumps(
+            {"keyframe": keyframe_pk, "depth": depth, "delta": delta},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        if len(serialized_data) < len(version.serialized_data):
+            version.format = f"{version.format}+{_DELTA}"
+            version.serialized_data = serialized_data
+            version.keyframe_id = keyframe_pk
+
+
+def _hash_data(serialized_data):
+    return hashlib.sha256(serialized_data.encode("utf8")).hexdigest()
+
+
+def _deduplicate_versions(versions, using):
+    from reversion.models import VersionPayload
+    version_hashes = [
+        (version, _hash_data(version.serialized_data))
+        for version in versions
+        if version._deduplicate
+    ]
+    if not version_hashes:
+        return
+    hashes = {data_hash for _, data_hash in version_hashes}
+
+    def load_payload_pks():
+        return {
+            data_hash: pk
+            for payloads in _filter_in_chunks(VersionPayload.objects.using(using), "hash", hashes)
+            for data_hash, pk in payloads.values_list("hash", "pk")
+        }
+
+    # Only insert payloads that haven't been seen before.
+    payload_pks = load_payload_pks()
+    if len(payload_pks) < len(hashes):
+        payload_data = {data_hash: version.serialized_data for version, data_hash in version_hashes}
+        VersionPayload.objects.using(using).bulk_create([
+            VersionPayload(hash=data_hash, serialized_data=payload_data[data_hash])
+            for data_hash in hashes
+            if data_hash not in payload_pks
+        ], ignore_conflicts=True)
+        payload_pks = load_payload_pks()
+    # Point the versions at their payloads.
+    for version, data_hash in version_hashes:
+        version.payload_id = payload_pks[data_hash]
+        version.serialized_data = ""
+
+
+def _field_changed(model, field_name, previous_field_dict, field_dict):
+    attname = model._meta.get_field(field_name).attname
+    return previous_field_dict.get(attname, _MISSING) != field_dict.get(attname, _MISSING)
+
+
+def _get_changed_fields(versions, using):
+    """Returns a list of (version, changed_field_names) for each of the given versions tracking changes."""
+    versions = [version for version in versions if version._track_changes]
+    previous_versions = {
+        id(version): previous_version
+        for version, previous_version in _get_previous_versions(versions, using)
+    }
+    changed_fields = []
+    for version in versions:
+        # Without a loadable previous version, every field has changed.
+        previous_field_dict = {}
+        if id(version) in previous_versions:
+            try:
+                previous_field_dict = previous_versions[id(version)]._local_field_dict
+            except RevertError:
+                pass
+        field_dict = version._local_field_dict
+        changed_fields.append((version, [
+            field_name
+            for field_name in _get_options(version._model).fields
+            if _field_changed(version._model, field_name, previous_field_dict, field_dict)
+        ]))
+    return changed_fields
+
+
+def _save_versions(revision, versions, using):
+    from reversion.models import Version, VersionFieldChange
+    can_use_bulk_create = connections[using].features.can_return_rows_from_bulk_insert
+
+    # Changed fields are found before any encoding, since the previous versions must not include these versions.
+    changed_fields = _get_changed_fields(versions, using)
+    _delta_encode_versions(versions, using)
+    for version in versions:
+        if version._compression:
+            _compress_version(version, version._compression)
+    _deduplicate_versions(versions, using)
+    for version in versions:
+        version.revision = revision
+        if not can_use_bulk_create:
+            version.save(using=using)
+
+    if can_use_bulk_create:
+        Version.objects.using(using).bulk_create(versions)
+
+    # Save the changed field index.
+    VersionFieldChange.objects.using(using).bulk_create([
+        VersionFieldChange(version=version, field_name=field_name)
+        for version, field_names in changed_fields
+        for field_name in field_names
+    ])
+    _save_latest_versions(versions, using)
+
+
+def _save_latest_versions(versions, using):
+    from reversion.models import LatestVersion
+    latest_versions = [
+        LatestVersion(
+            content_type=version.content_type,
+            db=version.db,
+            object_id=version.object_id,
+            version=version,
+        )
+        for version in versions
+        if version._track_latest
+    ]
+    if not latest_versions:
+        return
+    latest_version_manager = LatestVersion.objects.using(using)
+    supports_ignore_conflicts = connections[using].features.supports_ignore_conflicts
+    if supports_ignore_conflicts:
+        # Create the missing pointers. Existing pointers are moved forward below.
+        latest_version_manager.bulk_create(latest_versions, ignore_conflicts=True)
+    model_db_version_ids = defaultdict(dict)
+    for latest_version in latest_versions:
+        model_db_version_ids[(latest_version.content_type, latest_version.db)][latest_version.object_id] = (
+            latest_version.version_id
+        )
+    # Each object adds four query parameters.
+    chunk_size = max(_get_chunk_size(using) // 4, 1)
+    for (content_type, db), version_ids in model_db_version_ids.items():
+        object_ids = list(version_ids)
+        for i in range(0, len(object_ids), chunk_size):
+            object_ids_chunk = object_ids[i:i + chunk_size]
+            latest_versions_chunk = latest_version_manager.filter(
+                content_type=content_type,
+                db=db,
+                object_id__in=object_ids_chunk,
+            )
+            # Pointers are only moved to a later version, so concurrent revisions can't move them back.
+            latest_versions_chunk.update(version=models.Case(
+                *(
+                    models.When(
+                        object_id=object_id,
+                        version__lt=version_ids[object_id],
+                        then=models.Value(version_ids[object_id]),
+                    )
+                    for object_id in object_ids_chunk
+                ),
+                default=models.F("version"),
+                output_field=models.IntegerField(),
+            ))
+            if not supports_ignore_conflicts:
+                existing_object_ids = set(latest_versions_chunk.values_list("object_id", flat=True))
+                latest_version_manager.bulk_create([
+                    LatestVersion(
+                        content_type=content_type,
+                        db=db,
+                        object_id=object_id,
+                        version_id=version_ids[object_id],
+                    )
+                    for object_id in object_ids_chunk
+                    if object_id not in existing_object_ids
+                ])
+
+
+def _save_meta(revision, meta, using):
+    for meta_model, meta_fields in meta:
+        meta_model._base_manager.db_manager(using=using).create(
+            revision=revision,
+            **meta_fields
+        )
+
+
+def _save_revision(versions, user=None, comment="", meta=(), date_created=None, using=None):
+    from reversion.models import Revision
+    versions = _filter_versions(versions, using)
     # Bail early if there are no objects to save.
     if not versions:
         return
@@ -249,23 +1178,82 @@ def _save_revision(versions, user=None, comment="", meta=(), date_created=None,
     # Save the revision.
     revision.save(using=using)
     # Save version models.
+    _save_versions(revision, versions, using)
+    # Save the meta information.
+    _save_meta(revision, meta, using)
+    # Send the post_revision_commit signal.
+    post_revision_commit.send(
+        sender=create_revision,
+        revision=revision,
+        versions=versions,
+    )
 
-    can_use_bulk_create = connections[using].features.can_return_rows_from_bulk_insert
 
-    for version in versions:
-        version.revision = revision
-        if not can_use_bulk_create:
-            version.save(using=using)
+def _flush_versions(frame, force):
+    from reversion.models import Version
+    stream = frame.stream
+    # Only flush from the outermost revision block, since nested blocks may still discard their versions.
+    if stream is None or frame.journal is not None:
+        return
+    versions = frame.db_versions[stream.using]
+    if not versions or (len(versions) < stream.batch_size and not force):
+        return
+    _add_references_to_revision(stream.using)
+    # Remove the versions from memory, remembering which objects have been flushed.
+    flushed_versions = list(versions.values())
+    replaced_versions = [
+        version for version_key, version in versions.items()
+        if version_key in stream.flushed_keys
+    ]
+    stream.flushed_keys.update(versions.keys())
+    versions.clear()
+    # Objects added again after being flushed replace their previously flushed version. These are deleted first, so
+    # the replacements are compared against the version before this revision.
+    revision = stream.revision
+    model_db_object_ids = defaultdict(list)
+    for version in replaced_versions:
+        model_db_object_ids[(version.content_type, version.db)].append(version.object_id)
+    for (content_type, db), object_ids in model_db_object_ids.items():
+        for replaced in _filter_in_chunks(
+            Version.objects.using(stream.using).filter(revision=revision, content_type=content_type, db=db),
+            "object_id",
+            object_ids,
+        ):
+            replaced.delete()
+    flushed_versions = _filter_versions(flushed_versions, stream.using)
+    if not flushed_versions:
+        return
+    # Save the revision on the first flush. Its metadata is updated when the revision block exits.
+    if revision.pk is None:
+        revision.date_created = frame.date_created
+        revision.save(using=stream.using)
+    _save_versions(revision, flushed_versions, stream.using)
 
-    if can_use_bulk_create:
-        Version.objects.using(using).bulk_create(versions)
 
+def _save_revision_stream(stream, user=None, comment="", meta=(), date_created=None):
+    from reversion.models import Version
+    revision = stream.revision
+    # Bail early if no objects were saved.
+    if revision.pk is None:
+        return
+    versions = Version.objects.using(stream.using).filter(revision=revision)
+    # Flushed versions may all have been replaced by duplicates that were discarded, leaving an empty revision.
+    if not versions.exists():
+        revision.delete(using=stream.using)
+        return
+    revision.user = user
+    revision.comment = comment
+    revision.date_created = date_created
+    # Send the pre_revision_commit signal.
+    pre_revision_commit.send(
+        sender=create_revision,
+        revision=revision,
+        versions=versions,
+    )
+    # Save the revision metadata.
+    revision.save(using=stream.using)
     # Save the meta information.
-    for meta_model, meta_fields in meta:
-        meta_model._base_manager.db_manager(using=using).create(
-            revision=revision,
-            **meta_fields
-        )
+    _save_meta(revision, meta, stream.using)
     # Send the post_revision_commit signal.
     post_revision_commit.send(
         sender=create_revision,
@@ -280,10 +1268,14 @@ def _dummy_context():
 
 
 @contextmanager
-def _create_revision_context(manage_manually, using, atomic):
+def _create_revision_context(manage_manually, using, atomic, defer, batch_size):
     context = transaction.atomic(using=using) if atomic else _dummy_context()
     with context:
-        _push_frame(manage_manually, using)
+        # Streamed revisions are saved incrementally, so must be rolled back as a whole if anything goes wrong.
+        if batch_size and not is_active() and not transaction.get_connection(using).in_atomic_block:
+            raise RevisionManagementError("Streamed revisions must be created inside an atomic block")
+        _push_frame(manage_manually, using, defer, batch_size)
+        commit = False
         try:
             yield
             if transaction.get_connection(using).in_atomic_block and transaction.get_rollback(using):
@@ -296,22 +1288,39 @@ def _create_revision_context(manage_manually, using, atomic):
             # Only save for a db if that's the last stack frame for that db.
             if not any(using in frame.db_versions for frame in _stack.get()[:-1]):
                 current_frame = _current_frame()
-                _save_revision(
-                    versions=current_frame.db_versions[using].values(),
-                    user=current_frame.user,
-                    comment=current_frame.comment,
-                    meta=current_frame.meta,
-                    date_created=current_frame.date_created,
-                    using=using,
-                )
+                if current_frame.stream and current_frame.stream.using == using:
+                    _flush_versions(current_frame, True)
+                    _save_revision_stream(
+                        stream=current_frame.stream,
+                        user=current_frame.user,
+                        comment=current_frame.comment,
+                        meta=current_frame.meta,
+                        date_created=current_frame.date_created,
+                    )
+                else:
+                    _add_references_to_revision(using)
+                    _save_revision(
+                        versions=current_frame.db_versions[using].values(),
+                        user=current_frame.user,
+                        comment=current_frame.comment,
+                        meta=current_frame.meta,
+                        date_created=current_frame.date_created,
+                        using=using,
+                    )
+            commit = True
         finally:
-            _pop_frame()
+            # Without a savepoint, the block's database writes are kept unless the transaction is rolled back, so its
+            # versions must be kept too.
+            if not commit and not atomic:
+                connection = transaction.get_connection(using)
+                commit = not (connection.in_atomic_block and transaction.get_rollback(using))
+            _pop_frame(commit)
 
 
-def create_revision(manage_manually=False, using=None, atomic=True):
+def create_revision(manage_manually=False, using=None, atomic=True, defer=False, batch_size=None):
     from reversion.models import Revision
     using = using or router.db_for_write(Revision)
-    return _ContextWrapper(_create_revision_context, (manage_manually, using, atomic))
+    return _ContextWrapper(_create_revision_context, (manage_manually, using, atomic, defer, batch_size))
 
 
 class _ContextWrapper:
@@ -336,16 +1345,72 @@ class _ContextWrapper:
 
 
 def _post_save_receiver(sender, instance, using, **kwargs):
-    if is_registered(sender) and is_active() and not is_manage_manually():
+    if is_active() and is_registered(sender) and not is_manage_manually():
         add_to_revision(instance, model_db=using)
 
 
 def _m2m_changed_receiver(instance, using, action, model, reverse, **kwargs):
     if action.startswith("post_") and not reverse:
-        if is_registered(instance) and is_active() and not is_manage_manually():
+        if is_active() and is_registered(instance.__class__) and not is_manage_manually():
             add_to_revision(instance, model_db=using)
 
 
+def _post_delete_receiver(sender, instance, using, **kwargs):
+    _add_tombstone(sender, force_str(instance.pk), using)
+
+
+def _tombstone_post_save_receiver(sender, instance, created, using, **kwargs):
+    # An object recreated with the pk of a deleted object is no longer deleted.
+    if created:
+        _remove_tombstone(sender, force_str(instance.pk), using)
+
+
+def _add_tombstone(model, object_id, model_db):
+    from reversion.models import Tombstone, Version
+    using = router.db_for_write(Tombstone)
+    version_pk = Version.objects.using(using).get_for_object_reference(
+        model,
+        object_id,
+        model_db=model_db,
+    ).order_by("-pk").values_list("pk", flat=True).first()
+    # Objects without versions can't be recovered.
+    if version_pk is None:
+        return
+    content_type = _get_content_type(model, using)
+    Tombstone.objects.using(using).update_or_create(
+        content_type=content_type,
+        object_id=object_id,
+        db=model_db,
+        defaults={
+            "version_id": version_pk,
+            "deleted_at": timezone.now(),
+        },
+    )
+    if is_active():
+        _current_frame().has_tombstones[(using, content_type.pk, model_db)] = True
+
+
+def _remove_tombstone(model, object_id, model_db):
+    from reversion.models import Tombstone
+    using = router.db_for_write(Tombstone)
+    content_type = _get_content_type(model, using)
+    tombstones = Tombstone.objects.using(using).filter(content_type=content_type, db=model_db)
+    # Within a revision block, remember models without tombstones, so bulk inserts don't delete for every object.
+    if is_active():
+        has_tombstones = _current_frame().has_tombstones
+        key = (using, content_type.pk, model_db)
+        if key not in has_tombstones:
+            has_tombstones[key] = tombstones.exists()
+        if not has_tombstones[key]:
+            return
+    tombstones.filter(object_id=object_id).delete()
+
+
+def _get_tombstone_senders_and_signals(model):
+    yield model, post_delete, _post_delete_receiver
+    yield model, post_save, _tombstone_post_save_receiver
+
+
 def _get_registration_key(model):
     return (model._meta.app_label, model._meta.model_name)
 
@@ -353,8 +1418,27 @@ def _get_registration_key(model):
 _registered_models = {}
 
 
+# Caches of version options and content types, keyed by model class. These are cleared on unregister.
+_model_options = {}
+
+
+_model_content_types = {}
+
+
+_model_serializers = {}
+
+
+_model_deserializers = {}
+
+
+# Signal receivers are only connected once the first revision block is opened, so processes that never create
+# revisions pay nothing for registered models being saved.
+_signals_connected = False
+_signals_lock = threading.Lock()
+
+
 def is_registered(model):
-    return _get_registration_key(model) in _registered_models
+    return model in _model_options or _get_registration_key(model) in _registered_models
 
 
 def get_registered_models():
@@ -376,13 +1460,27 @@ def _get_senders_and_signals(model):
 
 
 def register(model=None, fields=None, exclude=(), follow=(), format="json",
-             for_concrete_model=True, ignore_duplicates=False, use_natural_foreign_keys=False):
+             for_concrete_model=True, ignore_duplicates=False, use_natural_foreign_keys=False, compression=None,
+             keyframe_interval=None, deduplicate=False, track_changes=False, tombstones=False,
+             track_latest=False):
     def register(model):
         # Prevent multiple registration.
         if is_registered(model):
             raise RegistrationError("{model} has already been registered with django-reversion".format(
                 model=model,
             ))
+        if compression is not None and compression not in _COMPRESSION:
+            raise RegistrationError("{compression} is not a supported compression".format(
+                compression=compression,
+            ))
+        if keyframe_interval and format not in _DELTA_FORMATS:
+            raise RegistrationError("{format} does not support delta encoding".format(
+                format=format,
+            ))
+        if format == _JSON_STORAGE_FORMAT and (compression or deduplicate):
+            raise RegistrationError("{format} does not support compression or deduplication".format(
+                format=format,
+            ))
         # Parse fields.
         opts = model._meta.concrete_model._meta
         version_options = _VersionOptions(
@@ -401,12 +1499,24 @@ def register(model=None, fields=None, exclude=(), follow=(), format="json",
             for_concrete_model=for_concrete_model,
             ignore_duplicates=ignore_duplicates,
             use_natural_foreign_keys=use_natural_foreign_keys,
+            compression=compression,
+            keyframe_interval=keyframe_interval,
+            deduplicate=deduplicate,
+            track_changes=track_changes,
+            tombstones=tombstones,
+            track_latest=track_latest,
         )
         # Register the model.
         _registered_models[_get_registration_key(model)] = version_options
-        # Connect signals.
-        for sender, signal, signal_receiver in _get_senders_and_signals(model):
-            signal.connect(signal_receiver, sender=sender)
+        _model_options[model] = version_options
+        # Connect signals. The lock ensures a model registered while signals are being connected isn't missed.
+        with _signals_lock:
+            if _signals_connected:
+                _connect_signals(model)
+        # Objects can be deleted outside of a revision block, so tombstone signals are always connected.
+        if tombstones:
+            for sender, signal, signal_receiver in _get_tombstone_senders_and_signals(model):
+                signal.connect(signal_receiver, sender=sender)
         # All done!
         return model
     # Return a class decorator if model is not given
@@ -416,6 +1526,21 @@ def register(model=None, fields=None, exclude=(), follow=(), format="json",
     return register(model)
 
 
+def _connect_signals(model):
+    for sender, signal, signal_receiver in _get_senders_and_signals(model):
+        signal.connect(signal_receiver, sender=sender)
+
+
+def _connect_registered_signals():
+    global _signals_connected
+    with _signals_lock:
+        # Only mark the signals as connected once they are, so other threads can't skip connecting them too early.
+        if not _signals_connected:
+            for model in list(_model_options):
+                _connect_signals(model)
+            _signals_connected = True
+
+
 def _assert_registered(model):
     if not is_registered(model):
         raise RegistrationError("{model} has not been registered with django-reversion".format(
@@ -424,22 +1549,44 @@ def _assert_registered(model):
 
 
 def _get_options(model):
-    _assert_registered(model)
-    return _registered_models[_get_registration_key(model)]
+    try:
+        return _model_options[model]
+    except KeyError:
+        _assert_registered(model)
+        version_options = _model_options[model] = _registered_models[_get_registration_key(model)]
+        return version_options
+
+
+def _clear_content_types(**kwargs):
+    _model_content_types.clear()
 
 
 def unregister(model):
     _assert_registered(model)
-    del _registered_models[_get_registration_key(model)]
+    registration_key = _get_registration_key(model)
+    del _registered_models[registration_key]
+    for cached_model in [m for m in _model_options if _get_registration_key(m) == registration_key]:
+        del _model_options[cached_model]
+    for cached_model in [m for m in _model_serializers if _get_registration_key(m) == registration_key]:
+        del _model_serializers[cached_model]
+    for cached_model in [m for m in _model_deserializers if _get_registration_key(m) == registration_key]:
+        del _model_deserializers[cached_model]
+    _clear_content_types()
     # Disconnect signals.
     for sender, signal, signal_receiver in _get_senders_and_signals(model):
         signal.disconnect(signal_receiver, sender=sender)
+    for sender, signal, signal_receiver in _get_tombstone_senders_and_signals(model):
+        signal.disconnect(signal_receiver, sender=sender)
 
 
 def _get_content_type(model, using):
-    from django.contrib.contenttypes.models import ContentType
-    version_options = _get_options(model)
-    return ContentType.objects.db_manager(using).get_for_model(
-        model,
-        for_concrete_model=version_options.for_concrete_model,
-    )
+    try:
+        return _model_content_types[(model, using)]
+    except KeyError:
+        from django.contrib.contenttypes.models import ContentType
+        version_options = _get_options(model)
+        content_type = _model_content_types[(model, using)] = ContentType.objects.db_manager(using).get_for_model(
+            model,
+            for_concrete_model=version_options.for_concrete_model,
+        )
+        return content_type
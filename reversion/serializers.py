@@ -0,0 +1,60 @@
+"""
+A compact JSON serialization format for versions.
+
+Each version stores a single model instance, so the ``model`` and ``fields`` envelope written by Django's ``json``
+format is redundant. The ``compact_json`` format writes each object as a flat mapping of field names to values, with
+the primary key stored under ``pk``, and no insignificant whitespace.
+
+The deserializer needs to be told which model the data belongs to, using the ``model`` option.
+"""
+import json
+
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Serializer as PythonSerializer, Deserializer as PythonDeserializer
+
+
+FORMAT = "compact_json"
+
+
+def _dump_objects(objects):
+    return json.dumps(
+        [
+            {"pk": data["pk"], **data["fields"]} if "pk" in data else data["fields"]
+            for data in objects
+        ],
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+class Serializer(PythonSerializer):
+
+    internal_use_only = True
+
+    def getvalue(self):
+        return _dump_objects(self.objects)
+
+
+def Deserializer(stream_or_string, *, model=None, **options):
+    if model is None:
+        raise DeserializationError(f"The {FORMAT} format requires a model to deserialize")
+    if not isinstance(stream_or_string, (bytes, str)):
+        stream_or_string = stream_or_string.read()
+    if isinstance(stream_or_string, bytes):
+        stream_or_string = stream_or_string.decode()
+    try:
+        objects = [
+            {
+                "model": model._meta.label_lower,
+                "pk": fields.pop("pk", None),
+                "fields": fields,
+            }
+            for fields in json.loads(stream_or_string)
+        ]
+        yield from PythonDeserializer(objects, **options)
+    except (GeneratorExit, DeserializationError):
+        raise
+    except Exception as exc:
+        raise DeserializationError() from exc
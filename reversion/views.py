@@ -12,7 +12,7 @@ def _set_user_from_request(request):
         set_user(request.user)
 
 
-def create_revision(manage_manually=False, using=None, atomic=True, request_creates_revision=None):
+def create_revision(manage_manually=False, using=None, atomic=True, request_creates_revision=None, defer=False):
     """
     View decorator that wraps the request in a revision.
 
@@ -24,7 +24,7 @@ def create_revision(manage_manually=False, using=None, atomic=True, request_crea
         @wraps(func)
         def do_revision_view(request, *args, **kwargs):
             if request_creates_revision(request):
-                with create_revision_base(manage_manually=manage_manually, using=using, atomic=atomic):
+                with create_revision_base(manage_manually=manage_manually, using=using, atomic=atomic, defer=defer):
                     response = func(request, *args, **kwargs)
                     _set_user_from_request(request)
                     return response
@@ -47,13 +47,16 @@ class RevisionMixin:
 
     revision_atomic = True
 
+    revision_defer = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.dispatch = create_revision(
             manage_manually=self.revision_manage_manually,
             using=self.revision_using,
             atomic=self.revision_atomic,
-            request_creates_revision=self.revision_request_creates_revision
+            request_creates_revision=self.revision_request_creates_revision,
+            defer=self.revision_defer,
         )(self.dispatch)
 
     def revision_request_creates_revision(self, request):
@@ -1,12 +1,20 @@
 from datetime import timedelta
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from django.contrib.auth.models import User
-from django.db import models
+from django.core import serializers
+from django.db import connection, models
+from django.db.models.signals import post_save
 from django.db.transaction import get_connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 import reversion
-from test_app.models import TestModel, TestModelRelated, TestModelThrough, TestModelParent, TestMeta
+from reversion import revisions
+from reversion.models import Revision, Version
+from test_app.models import (
+    TestModel, TestModelRelated, TestModelThrough, TestModelParent, TestMeta, TestModelInline,
+    TestModelNestedInline, TestModelEscapePK, TestModelInlineByNaturalKey, TestModelWithNaturalKey,
+)
 from test_app.tests.base import TestBase, TestBaseTransaction, TestModelMixin, UserMixin
 
 
@@ -73,6 +81,58 @@ class UnregisterTest(TestModelMixin, TestBase):
         self.assertFalse(reversion.is_registered(TestModel))
 
 
+class RegisterCacheTest(TestBase):
+
+    def testRegisterCacheQueries(self):
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            TestModel.objects.create()
+        with CaptureQueriesContext(connection) as queries:
+            with reversion.create_revision():
+                TestModel.objects.create()
+        self.assertFalse([query for query in queries if "django_content_type" in query["sql"]])
+
+    def testRegisterCacheReregister(self):
+        reversion.register(TestModel, fields=("id",))
+        with reversion.create_revision():
+            TestModel.objects.create()
+        reversion.unregister(TestModel)
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            obj = TestModel.objects.create(name="v1")
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["name"], "v1")
+
+
+class RegisterSignalsTest(TestBase):
+
+    def testRegisterSignalsConnectedLazily(self):
+        with patch.object(revisions, "_signals_connected", False):
+            reversion.register(TestModel)
+            self.assertFalse(post_save.has_listeners(TestModel))
+            with reversion.create_revision():
+                obj = TestModel.objects.create()
+            self.assertTrue(post_save.has_listeners(TestModel))
+        self.assertSingleRevision((obj,))
+
+    def testRegisterSignalsConnectedFlag(self):
+        connected_flags = []
+        connect_signals = revisions._connect_signals
+
+        def record_connect_signals(model):
+            # Other threads must not skip connecting signals until every model is connected.
+            connected_flags.append(revisions._signals_connected)
+            connect_signals(model)
+
+        with patch.object(revisions, "_signals_connected", False):
+            reversion.register(TestModel)
+            with patch.object(revisions, "_connect_signals", record_connect_signals):
+                with reversion.create_revision():
+                    pass
+            self.assertTrue(revisions._signals_connected)
+        self.assertTrue(connected_flags)
+        self.assertNotIn(True, connected_flags)
+
+
 class UnregisterUnregisteredTest(TestBase):
 
     def testUnregisterNotRegistered(self):
@@ -107,6 +167,29 @@ class CreateRevisionTest(TestModelMixin, TestBase):
             pass
         self.assertNoRevision()
 
+    def testCreateRevisionNestedException(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            try:
+                with reversion.create_revision():
+                    obj.name = "v2"
+                    obj.save()
+                    raise Exception("Boom!")
+            except Exception:
+                pass
+        self.assertSingleRevision((obj,))
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["name"], "v1")
+
+    def testCreateRevisionNestedExceptionNonAtomic(self):
+        with reversion.create_revision():
+            try:
+                with reversion.create_revision(atomic=False):
+                    obj = TestModel.objects.create()
+                    raise Exception("Boom!")
+            except Exception:
+                pass
+        self.assertSingleRevision((obj,))
+
     def testCreateRevisionDecorator(self):
         obj = reversion.create_revision()(TestModel.objects.create)()
         self.assertSingleRevision((obj,))
@@ -128,6 +211,205 @@ class CreateRevisionTest(TestModelMixin, TestBase):
         self.assertEqual(_callback.call_count, 1)
 
 
+class SerializeTest(TestBase):
+
+    def assertSerialized(self, obj, **options):
+        reversion.register(obj.__class__, **options)
+        with reversion.create_revision():
+            obj.save()
+        version_options = revisions._get_options(obj.__class__)
+        self.assertEqual(
+            Version.objects.get_for_object(obj).get().serialized_data,
+            serializers.serialize(
+                "json",
+                (obj,),
+                fields=version_options.fields,
+                use_natural_foreign_keys=version_options.use_natural_foreign_keys,
+            ),
+        )
+
+    def testSerialize(self):
+        obj = TestModel.objects.create(name="v1 ☃")
+        obj.related.add(TestModelRelated.objects.create())
+        self.assertSerialized(obj)
+
+    def testSerializeFields(self):
+        self.assertSerialized(TestModel.objects.create(), fields=("name",))
+
+    def testSerializeForeignKey(self):
+        self.assertSerialized(TestModelInline(test_model=TestModel.objects.create()))
+
+    def testSerializeNaturalForeignKey(self):
+        self.assertSerialized(
+            TestModelInlineByNaturalKey(test_model=TestModelWithNaturalKey.objects.create()),
+            use_natural_foreign_keys=True,
+        )
+
+    def testSerializeInheritance(self):
+        self.assertSerialized(TestModelParent.objects.create())
+
+    def testSerializeCharPK(self):
+        self.assertSerialized(TestModelEscapePK(name="a_b"))
+
+
+class CreateRevisionDeferTest(TestModelMixin, TestBase):
+
+    def testCreateRevisionDefer(self):
+        with reversion.create_revision(defer=True):
+            obj = TestModel.objects.create()
+            obj.name = "v2"
+            obj.save()
+            obj.name = "v3"
+            obj.save()
+        self.assertSingleRevision((obj,))
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["name"], "v3")
+
+    def testCreateRevisionDeferM2M(self):
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision(defer=True):
+            obj = TestModel.objects.create()
+            obj.related.add(obj_related)
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["related"], [obj_related.pk])
+
+    def testCreateRevisionDeferQueries(self):
+        obj_related = TestModelRelated.objects.create()
+
+        def count_queries(obj_count):
+            objs = [TestModel.objects.create() for _ in range(obj_count)]
+            for obj in objs:
+                obj.related.add(obj_related)
+            with CaptureQueriesContext(connection) as queries:
+                with reversion.create_revision(defer=True):
+                    for obj in objs:
+                        reversion.add_to_revision(obj)
+            return len(queries)
+
+        count_queries(1)  # Warm the content type cache.
+        self.assertEqual(count_queries(10), count_queries(50))
+
+    def testCreateRevisionDeferDeleted(self):
+        with reversion.create_revision(defer=True):
+            obj = TestModel.objects.create()
+            obj.delete()
+        self.assertNoRevision()
+
+    def testCreateRevisionDeferNested(self):
+        with reversion.create_revision():
+            obj_1 = TestModel.objects.create()
+            with reversion.create_revision(defer=True):
+                obj_2 = TestModel.objects.create()
+        self.assertSingleRevision((obj_1, obj_2))
+
+
+class CreateRevisionDeferFollowTest(TestBase):
+
+    def testCreateRevisionDeferFollow(self):
+        reversion.register(TestModel, follow=("related",))
+        reversion.register(TestModelRelated)
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision(defer=True):
+            obj = TestModel.objects.create()
+            obj.related.add(obj_related)
+        self.assertSingleRevision((obj, obj_related))
+
+
+class CreateRevisionStreamTest(TestModelMixin, TestBase):
+
+    def testCreateRevisionStream(self):
+        with reversion.create_revision(batch_size=2):
+            objs = [TestModel.objects.create(name=str(n)) for n in range(5)]
+            reversion.set_comment("comment v1")
+        self.assertSingleRevision(objs, comment="comment v1")
+
+    def testCreateRevisionStreamBulk(self):
+        objs = [TestModel.objects.create(name=str(n)) for n in range(5)]
+        with reversion.create_revision(batch_size=2):
+            reversion.add_to_revision_bulk(TestModel.objects.all())
+        self.assertSingleRevision(objs)
+
+    def testCreateRevisionStreamUpdate(self):
+        with reversion.create_revision(batch_size=2):
+            obj_1 = TestModel.objects.create(name="v1")
+            obj_2 = TestModel.objects.create()
+            obj_1.name = "v2"
+            obj_1.save()
+        self.assertSingleRevision((obj_1, obj_2))
+        self.assertEqual(Version.objects.get_for_object(obj_1).get().field_dict["name"], "v2")
+
+    def testCreateRevisionStreamEmpty(self):
+        with reversion.create_revision(batch_size=2):
+            pass
+        self.assertNoRevision()
+
+    def testCreateRevisionStreamNested(self):
+        with reversion.create_revision(batch_size=2):
+            obj_1 = TestModel.objects.create()
+            try:
+                with reversion.create_revision():
+                    TestModel.objects.create()
+                    TestModel.objects.create()
+                    raise Exception("Boom!")
+            except Exception:
+                pass
+        self.assertSingleRevision((obj_1,))
+
+
+class CreateRevisionStreamIgnoreDuplicatesTest(TestBase):
+
+    def testCreateRevisionStreamIgnoreDuplicatesReplaced(self):
+        reversion.register(TestModel, ignore_duplicates=True)
+        with reversion.create_revision(batch_size=2):
+            obj = TestModel.objects.create()
+            objs = [TestModel.objects.create(name=str(n)) for n in range(3)]
+            obj.save()
+            objs.append(TestModel.objects.create())
+        self.assertSingleRevision((obj, *objs))
+
+    def testCreateRevisionStreamIgnoreDuplicatesReverted(self):
+        reversion.register(TestModel, ignore_duplicates=True)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        received = []
+
+        def receiver(revision, **kwargs):
+            received.append(revision)
+
+        reversion.signals.post_revision_commit.connect(receiver)
+        try:
+            with reversion.create_revision(batch_size=1):
+                obj.name = "v2"
+                obj.save()
+                obj.name = "v1"
+                obj.save()
+        finally:
+            reversion.signals.post_revision_commit.disconnect(receiver)
+        self.assertSingleRevision((obj,))
+        self.assertEqual(received, [])
+
+    def testCreateRevisionStreamPreRevisionCommit(self):
+        reversion.register(TestModel)
+        received = []
+
+        def receiver(revision, versions, **kwargs):
+            received.append([version.object_id for version in versions])
+
+        reversion.signals.pre_revision_commit.connect(receiver)
+        try:
+            with reversion.create_revision(batch_size=2):
+                objs = [TestModel.objects.create() for _ in range(3)]
+        finally:
+            reversion.signals.pre_revision_commit.disconnect(receiver)
+        self.assertEqual(sorted(received[0]), sorted(str(obj.pk) for obj in objs))
+
+
+class CreateRevisionStreamAtomicTest(TestModelMixin, TestBaseTransaction):
+
+    def testCreateRevisionStreamNonAtomic(self):
+        with self.assertRaises(reversion.RevisionManagementError):
+            with reversion.create_revision(atomic=False, batch_size=2):
+                pass
+
+
 class CreateRevisionAtomicTest(TestModelMixin, TestBaseTransaction):
     def testCreateRevisionAtomic(self):
         self.assertFalse(get_connection().in_atomic_block)
@@ -182,6 +464,13 @@ class CreateRevisionDbTest(TestModelMixin, TestBase):
         self.assertSingleRevision((obj,), using="mysql")
         self.assertSingleRevision((obj,), using="postgres")
 
+    def testCreateRevisionIntegerPkParams(self):
+        obj = TestModel.objects.db_manager("postgres").create()
+        chunk, = revisions._filter_in_chunks(TestModel.objects.using("postgres"), "pk", [str(obj.pk)])
+        _, params = chunk.query.get_compiler("postgres").as_sql()
+        self.assertEqual(params, (obj.pk,))
+        self.assertEqual(list(chunk), [obj])
+
 
 class CreateRevisionFollowTest(TestBase):
 
@@ -207,6 +496,23 @@ class CreateRevisionFollowTest(TestBase):
             )
         self.assertSingleRevision((obj, obj_through, obj_related))
 
+    def testCreateRevisionFollowQueries(self):
+        reversion.register(TestModel, follow=("testmodelinline_set",))
+        reversion.register(TestModelInline, follow=("testmodelnestedinline_set",))
+        reversion.register(TestModelNestedInline)
+
+        def count_queries(inline_count):
+            obj = TestModel.objects.create()
+            for _ in range(inline_count):
+                obj_inline = TestModelInline.objects.create(test_model=obj)
+                TestModelNestedInline.objects.create(test_model_inline=obj_inline)
+            with reversion.create_revision(), CaptureQueriesContext(connection) as queries:
+                reversion.add_to_revision(obj)
+            return len(queries)
+
+        count_queries(1)  # Warm the content type cache.
+        self.assertEqual(count_queries(1), count_queries(10))
+
     def testCreateRevisionFollowInvalid(self):
         reversion.register(TestModel, follow=("name",))
         with reversion.create_revision():
@@ -224,6 +530,63 @@ class CreateRevisionIgnoreDuplicatesTest(TestBase):
             obj.save()
         self.assertSingleRevision((obj,))
 
+    def testCreateRevisionIgnoreDuplicatesBatch(self):
+        reversion.register(TestModel, ignore_duplicates=True)
+        with reversion.create_revision():
+            obj_1 = TestModel.objects.create()
+            obj_2 = TestModel.objects.create()
+        with reversion.create_revision():
+            obj_1.save()
+            obj_2.name = "v2"
+            obj_2.save()
+        self.assertEqual(Version.objects.get_for_object(obj_1).count(), 1)
+        self.assertEqual(Version.objects.get_for_object(obj_2).count(), 2)
+
+    def testCreateRevisionIgnoreDuplicatesFollowed(self):
+        reversion.register(TestModel, follow=("testmodelinline_set",))
+        reversion.register(TestModelInline, ignore_duplicates=True)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            obj_inline = TestModelInline.objects.create(test_model=obj)
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+            obj_inline.save()
+        self.assertEqual(Version.objects.get_for_object(obj_inline).count(), 2)
+
+    def assertIgnoreDuplicatesFollow(self):
+        obj = TestModel.objects.create()
+        obj_inline = TestModelInline.objects.create(test_model=obj)
+        for _ in range(2):
+            with reversion.create_revision():
+                reversion.add_to_revision(obj)
+                obj.save()
+        self.assertEqual(Revision.objects.count(), 1)
+        self.assertSingleRevision((obj, obj_inline))
+
+    def testCreateRevisionIgnoreDuplicatesFollow(self):
+        reversion.register(TestModel, follow=("testmodelinline_set",), ignore_duplicates=True)
+        reversion.register(TestModelInline)
+        self.assertIgnoreDuplicatesFollow()
+
+    def testCreateRevisionIgnoreDuplicatesFollowCycle(self):
+        reversion.register(TestModel, follow=("testmodelinline_set",), ignore_duplicates=True)
+        reversion.register(TestModelInline, follow=("test_model",))
+        self.assertIgnoreDuplicatesFollow()
+
+    def testCreateRevisionIgnoreDuplicatesFollowChanged(self):
+        reversion.register(TestModel, follow=("testmodelinline_set",), ignore_duplicates=True)
+        reversion.register(TestModelInline)
+        obj = TestModel.objects.create()
+        obj_inline = TestModelInline.objects.create(test_model=obj)
+        with reversion.create_revision():
+            obj.save()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        self.assertEqual(Version.objects.get_for_object(obj).count(), 2)
+        self.assertEqual(Version.objects.get_for_object(obj_inline).count(), 2)
+
 
 class CreateRevisionInheritanceTest(TestModelMixin, TestBase):
 
@@ -343,3 +706,83 @@ class AddMetaTest(TestModelMixin, TestBase):
         self.assertNoRevision()
         self.assertSingleRevision((obj,), meta_names=("meta v1",), using="mysql")
         self.assertSingleRevision((obj,), meta_names=("meta v1",), using="postgres")
+
+
+class AddToRevisionTest(TestModelMixin, TestBase):
+
+    def testAddToRevision(self):
+        obj = TestModel.objects.create()
+        with reversion.create_revision():
+            reversion.add_to_revision(obj)
+        self.assertSingleRevision((obj,))
+
+    def testAddToRevisionNoBlock(self):
+        obj = TestModel.objects.create()
+        with self.assertRaises(reversion.RevisionManagementError):
+            reversion.add_to_revision(obj)
+
+
+class AddToRevisionBulkTest(TestModelMixin, TestBase):
+
+    def testAddToRevisionBulk(self):
+        objs = [TestModel.objects.create(name=f"v{i}") for i in range(3)]
+        with reversion.create_revision():
+            reversion.add_to_revision_bulk(TestModel.objects.all())
+        self.assertSingleRevision(objs)
+
+    def testAddToRevisionBulkQueries(self):
+        obj_related = TestModelRelated.objects.create()
+
+        def count_queries(obj_count):
+            objs = [TestModel.objects.create() for _ in range(obj_count)]
+            for obj in objs:
+                obj.related.add(obj_related)
+            with reversion.create_revision(), CaptureQueriesContext(connection) as queries:
+                reversion.add_to_revision_bulk(objs)
+            return len(queries)
+
+        count_queries(1)  # Warm the content type cache.
+        self.assertEqual(count_queries(10), count_queries(100))
+        self.assertEqual(Version.objects.get_for_model(TestModel).first().field_dict["related"], [obj_related.pk])
+
+    def testAddToRevisionBulkSerializedData(self):
+        obj = TestModel.objects.create()
+        with reversion.create_revision():
+            reversion.add_to_revision_bulk([obj])
+        self.assertEqual(
+            Version.objects.get_for_object(obj).get().serialized_data,
+            serializers.serialize("json", (obj,), fields=("id", "name", "related")),
+        )
+
+    def testAddToRevisionBulkEmpty(self):
+        with reversion.create_revision():
+            reversion.add_to_revision_bulk(TestModel.objects.none())
+        self.assertNoRevision()
+
+    def testAddToRevisionBulkNoBlock(self):
+        with self.assertRaises(reversion.RevisionManagementError):
+            reversion.add_to_revision_bulk(TestModel.objects.all())
+
+
+class AddToRevisionBulkLargeTest(TestBase):
+
+    def testAddToRevisionBulkLarge(self):
+        reversion.register(TestModelRelated)
+        TestModelRelated.objects.bulk_create([TestModelRelated() for _ in range(2500)])
+        with reversion.create_revision():
+            reversion.add_to_revision_bulk(TestModelRelated.objects.all())
+        self.assertEqual(Version.objects.get_for_model(TestModelRelated).count(), 2500)
+
+
+class AddToRevisionBulkFollowTest(TestBase):
+
+    def testAddToRevisionBulkFollow(self):
+        reversion.register(TestModel, follow=("testmodelinline_set",))
+        reversion.register(TestModelInline, follow=("test_model",))
+        obj_1 = TestModel.objects.create()
+        obj_2 = TestModel.objects.create()
+        obj_inline_1 = TestModelInline.objects.create(test_model=obj_1)
+        obj_inline_2 = TestModelInline.objects.create(test_model=obj_2)
+        with reversion.create_revision():
+            reversion.add_to_revision_bulk([obj_1, obj_2])
+        self.assertSingleRevision((obj_1, obj_2, obj_inline_1, obj_inline_2))
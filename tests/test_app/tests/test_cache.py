@@ -0,0 +1,93 @@
+from django.test.utils import override_settings
+import reversion
+from reversion.cache import VersionCache, get_cache
+from reversion.models import Version
+from test_app.models import TestModel
+from test_app.tests.base import TestBase, TestModelMixin
+
+
+use_cache = override_settings(
+    REVERSION_CACHE_SIZE=10,
+)
+
+
+class VersionCacheTest(TestBase):
+
+    def testVersionCache(self):
+        cache = VersionCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(len(cache), 2)
+
+    def testVersionCacheDisabled(self):
+        self.assertIsNone(get_cache())
+
+
+@use_cache
+class VersionCacheFieldDictTest(TestModelMixin, TestBase):
+
+    def testFieldDictCached(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        Version.objects.get_for_object(obj).get().field_dict
+        version = Version.objects.get_for_object(obj).get()
+        hits = get_cache().hits
+        self.assertEqual(version.field_dict["name"], "v1")
+        self.assertEqual(get_cache().hits, hits + 1)
+
+    def testFieldDictCachedCopy(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        Version.objects.get_for_object(obj).get().field_dict["name"] = "boom"
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["name"], "v1")
+
+    def testFieldDictCachedPythonFormat(self):
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, format="python")
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        version = Version.objects.get_for_object(obj).get()
+        version.field_dict
+        # A version saved with a reused primary key doesn't get the cached data of the old version.
+        serialized_json = version.serialized_json
+        serialized_json["fields"]["name"] = "v2"
+        Version.objects.filter(pk=version.pk).update(serialized_json=serialized_json)
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["name"], "v2")
+
+    @override_settings(REVERSION_CACHE_KEY_PREFIX="site.")
+    def testCacheKeyPrefix(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        self.assertTrue(Version.objects.get_for_object(obj).get()._get_cache_key("field_dict").startswith("site."))
+
+    def testRevertCached(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        Version.objects.get_for_object(obj).get().revert()
+        obj.name = "v2"
+        obj.save()
+        Version.objects.get_for_object(obj).get().revert()
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "v1")
+
+
+@override_settings(
+    REVERSION_CACHE_SIZE=10,
+    REVERSION_CACHE_BACKEND="default",
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class VersionCacheBackendTest(TestModelMixin, TestBase):
+
+    def testFieldDictCachedBackend(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        Version.objects.get_for_object(obj).get().field_dict
+        get_cache().clear()
+        Version.objects.get_for_object(obj).get().field_dict
+        self.assertEqual(get_cache().hits, 1)
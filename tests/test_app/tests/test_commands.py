@@ -2,7 +2,9 @@ import json
 from datetime import timedelta
 from django.core.management import CommandError
 from django.utils import timezone
+from unittest.mock import patch
 import reversion
+from reversion.models import Tombstone, Version, VersionPayload
 from test_app.models import TestModel
 from test_app.tests.base import TestBase, TestModelMixin
 
@@ -102,6 +104,16 @@ class DeleteRevisionsTest(TestModelMixin, TestBase):
         self.assertNoRevision()
 
 
+class DeleteRevisionsPayloadTest(TestBase):
+
+    def testDeleteRevisionsPayloads(self):
+        reversion.register(TestModel, deduplicate=True)
+        with reversion.create_revision():
+            TestModel.objects.create()
+        self.callCommand("deleterevisions")
+        self.assertEqual(VersionPayload.objects.count(), 0)
+
+
 class DeleteRevisionsAppLabelTest(TestModelMixin, TestBase):
 
     def testDeleteRevisionsAppLabel(self):
@@ -207,3 +219,60 @@ class DeleteRevisionsKeepTest(TestModelMixin, TestBase):
         self.assertSingleRevision((obj_1,), comment="obj_1 v2")
         self.assertSingleRevision((obj_2,), comment="obj_2 v2")
         self.assertSingleRevision((obj_3,))
+
+
+class DeleteRevisionsKeyframeTest(TestBase):
+
+    def testDeleteRevisionsKeepKeyframes(self):
+        reversion.register(TestModel, keyframe_interval=10)
+        obj = TestModel.objects.create()
+        for n in range(20):
+            with reversion.create_revision():
+                obj.name = f"v{n}"
+                obj.save()
+        self.callCommand("deleterevisions", keep=3)
+        versions = Version.objects.get_for_object(obj)
+        self.assertEqual([version.field_dict["name"] for version in versions[:3]], ["v19", "v18", "v17"])
+        self.assertEqual(versions.count(), 4)
+
+    def testDeleteRevisionsKeyframeIndex(self):
+        reversion.register(TestModel, keyframe_interval=10)
+        obj = TestModel.objects.create()
+        for n in range(5):
+            with reversion.create_revision():
+                obj.name = f"v{n}"
+                obj.save()
+        keyframe = Version.objects.get_for_object(obj).last()
+        self.assertEqual(
+            set(Version.objects.get_for_object(obj).exclude(pk=keyframe.pk).values_list("keyframe", flat=True)),
+            {keyframe.pk},
+        )
+        # Kept delta-encoded versions are found by their keyframe, without decoding their data.
+        with patch("reversion.revisions._decode_version_data", side_effect=AssertionError):
+            self.callCommand("deleterevisions", keep=2)
+        self.assertEqual(Version.objects.get_for_object(obj).count(), 3)
+
+
+class CreateTombstonesTest(TestBase):
+
+    def testCreateTombstones(self):
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            TestModel.objects.create()
+        pk = obj.pk
+        obj.delete()
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, tombstones=True)
+        self.callCommand("createtombstones")
+        self.assertEqual(Tombstone.objects.get().object_id, str(pk))
+        self.assertEqual(Version.objects.get_deleted(TestModel).get().object_id, str(pk))
+        self.callCommand("createtombstones")
+        self.assertEqual(Tombstone.objects.count(), 1)
+
+    def testCreateTombstonesNotEnabled(self):
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            TestModel.objects.create().delete()
+        self.callCommand("createtombstones")
+        self.assertEqual(Tombstone.objects.count(), 0)
@@ -1,5 +1,12 @@
+from datetime import timedelta
+from django.core import serializers
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 import reversion
-from reversion.models import Version
+from reversion import revisions
+from reversion.errors import RevertError
+from reversion.models import LatestVersion, Tombstone, Version, VersionPayload
 from test_app.models import (
     TestModel, TestModelRelated, TestModelParent, TestModelInline,
     TestModelNestedInline,
@@ -8,6 +15,7 @@ from test_app.models import (
 )
 from test_app.tests.base import TestBase, TestModelMixin, TestModelParentMixin
 import json
+from unittest.mock import patch
 
 
 class GetForModelTest(TestModelMixin, TestBase):
@@ -160,6 +168,53 @@ class GetForObjectReferenceModelDbTest(TestModelMixin, TestBase):
         self.assertEqual(Version.objects.get_for_object_reference(TestModel, obj.pk, model_db="mysql").count(), 1)
 
 
+class GetForObjectsTest(TestModelMixin, TestBase):
+
+    def setUp(self):
+        super().setUp()
+        with reversion.create_revision():
+            self.objs = [TestModel.objects.create(name=str(n)) for n in range(3)]
+        for name in ("v2", "v3"):
+            with reversion.create_revision():
+                for obj in self.objs[:2]:
+                    obj.name = name
+                    obj.save()
+
+    def testGetForObjects(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(len(Version.objects.get_for_objects(self.objs)), 7)
+
+    def testGetForObjectsEmpty(self):
+        self.assertEqual(Version.objects.get_for_objects([]).count(), 0)
+
+    def testGetForObjectReferences(self):
+        versions = Version.objects.get_for_object_references(TestModel, [self.objs[0].pk, self.objs[2].pk])
+        self.assertEqual(versions.count(), 4)
+
+    def assertGetForObjectsLatest(self):
+        versions = Version.objects.get_for_objects(self.objs, latest=2)
+        self.assertEqual(
+            sorted((version.object_id, version.field_dict["name"]) for version in versions),
+            sorted([
+                (str(self.objs[0].pk), "v2"), (str(self.objs[0].pk), "v3"),
+                (str(self.objs[1].pk), "v2"), (str(self.objs[1].pk), "v3"),
+                (str(self.objs[2].pk), "2"),
+            ]),
+        )
+
+    def testGetForObjectsLatest(self):
+        self.assertGetForObjectsLatest()
+
+    def testGetForObjectsLatestWithoutWindow(self):
+        with patch.object(connection.features, "supports_over_clause", False):
+            self.assertGetForObjectsLatest()
+
+    def testPrefetchForObjects(self):
+        with self.assertNumQueries(1):
+            Version.objects.prefetch_for_objects(self.objs, latest=1)
+        self.assertEqual([obj.versions[0].field_dict["name"] for obj in self.objs], ["v3", "v3", "2"])
+
+
 class GetDeletedTest(TestModelMixin, TestBase):
     databases = {"default", "mysql", "postgres"}
 
@@ -204,6 +259,13 @@ class GetDeletedTest(TestModelMixin, TestBase):
         obj.delete()
         self.assertEqual(Version.objects.using("mysql").get_deleted(TestModel, model_db="mysql").count(), 1)
 
+    def testGetDeletedMySQLAntiJoin(self):
+        with reversion.create_revision(using="mysql"):
+            objs = [TestModel.objects.using("mysql").create() for _ in range(3)]
+        objs[0].delete()
+        with self.assertNumQueries(1, using="mysql"):
+            self.assertEqual(len(Version.objects.using("mysql").get_deleted(TestModel, model_db="mysql")), 1)
+
 
 class GetDeletedDbTest(TestModelMixin, TestBase):
     databases = {"default", "mysql", "postgres"}
@@ -234,6 +296,275 @@ class GetDeletedModelDbTest(TestModelMixin, TestBase):
         self.assertEqual(Version.objects.get_deleted(TestModel, model_db="postgres").count(), 1)
 
 
+class GetDeletedChunkedTest(TestModelMixin, TestBase):
+    databases = {"default", "postgres"}
+
+    def testGetDeletedChunked(self):
+        with reversion.create_revision():
+            objs = [TestModel.objects.db_manager("postgres").create() for _ in range(5)]
+        deleted_pks = {str(obj.pk) for obj in objs[1::2]}
+        for obj in objs[1::2]:
+            obj.delete()
+        with patch("reversion.models._get_chunk_size", return_value=2):
+            deleted = Version.objects.get_deleted(TestModel, model_db="postgres")
+            self.assertEqual({version.object_id for version in deleted}, deleted_pks)
+
+    def testGetDeletedInvalidObjectId(self):
+        with reversion.create_revision():
+            TestModel.objects.db_manager("postgres").create()
+        Version.objects.get_for_model(TestModel, model_db="postgres").update(object_id="boom")
+        self.assertEqual(Version.objects.get_deleted(TestModel, model_db="postgres").get().object_id, "boom")
+
+    def testGetDeletedBoundedParams(self):
+        with reversion.create_revision(using="postgres"):
+            objs = [TestModel.objects.create() for _ in range(7)]
+        deleted_pks = [str(obj.pk) for obj in reversed(objs[:5])]
+        for obj in objs[:5]:
+            obj.delete()
+        params_counts = []
+
+        def count_params(execute, sql, params, many, context):
+            params_counts.append(len(params or ()))
+            return execute(sql, params, many, context)
+
+        with connections["postgres"].execute_wrapper(count_params), \
+                patch("reversion.models._get_chunk_size", return_value=2):
+            deleted = Version.objects.using("postgres").get_deleted(TestModel, model_db="default")
+            self.assertEqual([version.object_id for version in deleted], deleted_pks)
+            self.assertEqual([version.object_id for version in deleted.order_by("pk")[1:3]], deleted_pks[::-1][1:3])
+            self.assertEqual(deleted.count(), 5)
+            self.assertTrue(deleted.exists())
+            self.assertEqual(
+                sorted(deleted.order_by().values_list("object_id", flat=True).iterator()),
+                sorted(deleted_pks),
+            )
+        # Each query has the content type, db, and at most one chunk of values.
+        self.assertLessEqual(max(params_counts), 4)
+
+
+class TombstoneTest(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        reversion.register(TestModel, tombstones=True)
+
+    def testTombstone(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.save()
+        pk = obj.pk
+        obj.delete()
+        tombstone = Tombstone.objects.get()
+        self.assertEqual(tombstone.object_id, str(pk))
+        self.assertEqual(tombstone.version, Version.objects.get_for_object_reference(TestModel, pk).first())
+        self.assertEqual(Version.objects.get_deleted(TestModel).get(), tombstone.version)
+
+    def testTombstoneDeletedOutsideRevision(self):
+        with reversion.create_revision():
+            TestModel.objects.create()
+        TestModel.objects.all().delete()
+        self.assertEqual(Version.objects.get_deleted(TestModel).count(), 1)
+
+    def testTombstoneUnversioned(self):
+        TestModel.objects.create().delete()
+        self.assertEqual(Tombstone.objects.count(), 0)
+
+    def testTombstoneRecover(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        obj.delete()
+        Version.objects.get_deleted(TestModel).get().revert()
+        self.assertEqual(Tombstone.objects.count(), 0)
+        self.assertEqual(Version.objects.get_deleted(TestModel).count(), 0)
+
+    def testTombstoneBulkInsert(self):
+        with reversion.create_revision(), CaptureQueriesContext(connection) as queries:
+            for _ in range(5):
+                TestModel.objects.create()
+        tombstone_queries = [query["sql"] for query in queries if "reversion_tombstone" in query["sql"]]
+        self.assertEqual(len(tombstone_queries), 1)
+        self.assertNotIn("DELETE", tombstone_queries[0])
+
+    def testTombstoneRecreateInRevision(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            # No tombstones exist when the first object is created.
+            TestModel.objects.create()
+            pk = obj.pk
+            obj.delete()
+            self.assertEqual(Tombstone.objects.count(), 1)
+            TestModel.objects.create(pk=pk)
+        self.assertEqual(Tombstone.objects.count(), 0)
+
+
+class TombstoneDbTest(TestBase):
+    databases = {"default", "postgres"}
+
+    def setUp(self):
+        super().setUp()
+        reversion.register(TestModel, tombstones=True)
+
+    def testTombstoneDb(self):
+        with reversion.create_revision(using="postgres"):
+            obj = TestModel.objects.create()
+        obj.delete()
+        self.assertEqual(Tombstone.objects.count(), 0)
+        self.assertEqual(Version.objects.get_deleted(TestModel).count(), 0)
+        self.assertEqual(Version.objects.using("postgres").get_deleted(TestModel).count(), 1)
+
+
+class LatestVersionTest(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        reversion.register(TestModel, track_latest=True, ignore_duplicates=True)
+
+    def testLatestVersion(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        latest_version = Version.objects.get_for_object(obj).first()
+        self.assertEqual(LatestVersion.objects.get().version, latest_version)
+        self.assertEqual(Version.objects.get_latest_for_object(obj).get(), latest_version)
+
+    def testLatestVersionDuplicate(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.save()
+        self.assertEqual(Version.objects.get_for_object(obj).count(), 1)
+        self.assertEqual(LatestVersion.objects.get().version, Version.objects.get_for_object(obj).get())
+
+    def testGetLatest(self):
+        with reversion.create_revision():
+            obj_1 = TestModel.objects.create()
+            obj_2 = TestModel.objects.create()
+        with reversion.create_revision():
+            obj_1.name = "v2"
+            obj_1.save()
+        self.assertEqual(
+            {version.field_dict["name"] for version in Version.objects.get_latest(TestModel)},
+            {"v1", "v2"},
+        )
+        self.assertEqual(Version.objects.get_latest_for_object(obj_2).get().field_dict["name"], "v1")
+
+    def testLatestVersionUntracked(self):
+        reversion.unregister(TestModel)
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, track_latest=True, ignore_duplicates=True)
+        with reversion.create_revision():
+            obj.save()
+        self.assertEqual(Version.objects.get_for_object(obj).count(), 1)
+
+    def testLatestVersionBackfill(self):
+        reversion.unregister(TestModel)
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            obj_1 = TestModel.objects.create()
+        with reversion.create_revision():
+            obj_1.name = "v2"
+            obj_1.save()
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, track_latest=True, ignore_duplicates=True)
+        with reversion.create_revision():
+            obj_2 = TestModel.objects.create()
+        self.assertEqual(
+            {(version.object_id, version.field_dict["name"]) for version in Version.objects.get_latest(TestModel)},
+            {(str(obj_1.pk), "v2"), (str(obj_2.pk), "v1")},
+        )
+        self.assertEqual(Version.objects.get_latest_for_object(obj_1).get().field_dict["name"], "v2")
+
+    def testLatestVersionConcurrent(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        earlier_version, latest_version = Version.objects.get_for_object(obj).order_by("pk")
+        # A revision saved concurrently with a lower version pk doesn't move the pointer back.
+        earlier_version._track_latest = True
+        revisions._save_latest_versions([earlier_version], "default")
+        self.assertEqual(LatestVersion.objects.get().version, latest_version)
+
+    def testLatestVersionWithoutIgnoreConflicts(self):
+        with patch.object(connection.features, "supports_ignore_conflicts", False):
+            with reversion.create_revision():
+                obj = TestModel.objects.create()
+            with reversion.create_revision():
+                obj.name = "v2"
+                obj.save()
+        self.assertEqual(LatestVersion.objects.get().version, Version.objects.get_for_object(obj).first())
+
+
+class GetLatestTest(TestModelMixin, TestBase):
+
+    def testGetLatest(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            TestModel.objects.create()
+        with reversion.create_revision():
+            obj.save()
+        self.assertEqual(Version.objects.get_latest(TestModel).count(), 2)
+        self.assertEqual(Version.objects.get_latest_for_object(obj).get(), Version.objects.get_for_object(obj).first())
+        self.assertEqual(LatestVersion.objects.count(), 0)
+
+
+class AsOfTest(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        reversion.register(TestModel, tombstones=True)
+        self.now = timezone.now()
+        with reversion.create_revision():
+            self.obj_1 = TestModel.objects.create()
+            reversion.set_date_created(self.now - timedelta(days=3))
+        with reversion.create_revision():
+            self.obj_2 = TestModel.objects.create(name="obj_2 v1")
+            reversion.set_date_created(self.now - timedelta(days=2))
+        with reversion.create_revision():
+            self.obj_1.name = "v2"
+            self.obj_1.save()
+            reversion.set_date_created(self.now - timedelta(days=1))
+
+    def assertAsOf(self, when, expected):
+        self.assertEqual(sorted((obj.pk, obj.name) for obj in Version.objects.as_of(TestModel, when)), expected)
+
+    def testAsOf(self):
+        self.assertAsOf(self.now - timedelta(days=4), [])
+        self.assertAsOf(self.now - timedelta(days=2), [(self.obj_1.pk, "v1"), (self.obj_2.pk, "obj_2 v1")])
+        self.assertAsOf(self.now, [(self.obj_1.pk, "v2"), (self.obj_2.pk, "obj_2 v1")])
+
+    def testAsOfDeleted(self):
+        pk = self.obj_2.pk
+        self.obj_2.delete()
+        self.assertAsOf(self.now - timedelta(days=2), [(self.obj_1.pk, "v1"), (pk, "obj_2 v1")])
+        self.assertAsOf(timezone.now(), [(self.obj_1.pk, "v2")])
+
+    def testAsOfKeyframeQueries(self):
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, keyframe_interval=10)
+        objs = []
+        for n in range(20):
+            with reversion.create_revision():
+                obj = TestModel.objects.create(name=f"obj_{n} v1")
+            with reversion.create_revision():
+                obj.name = f"obj_{n} v2"
+                obj.save()
+            objs.append(obj)
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                {(obj.pk, obj.name) for obj in Version.objects.as_of(TestModel, timezone.now())},
+                {(self.obj_1.pk, "v2"), (self.obj_2.pk, "obj_2 v1")} | {(obj.pk, obj.name) for obj in objs},
+            )
+
+
 class FieldDictTest(TestModelMixin, TestBase):
 
     def testFieldDict(self):
@@ -308,6 +639,464 @@ class FieldDictInheritanceTest(TestModelParentMixin, TestBase):
         })
 
 
+class CompactFormatTest(TestBase):
+
+    def testCompactFormatNotPublic(self):
+        # The format can't be loaded without the model, so can't be used by dumpdata.
+        self.assertNotIn("compact_json", serializers.get_public_serializer_formats())
+
+    def testCompactFormat(self):
+        reversion.register(TestModel, format="compact_json")
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            obj.related.add(obj_related)
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(json.loads(version.serialized_data), [{
+            "pk": obj.pk,
+            "name": "v1",
+            "related": [obj_related.pk],
+        }])
+        self.assertEqual(version.field_dict, {
+            "id": obj.pk,
+            "name": "v1",
+            "related": [obj_related.pk],
+        })
+
+    def testCompactFormatRevert(self):
+        reversion.register(TestModel, format="compact_json")
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        obj.name = "v2"
+        obj.save()
+        Version.objects.get_for_object(obj).get().revert()
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "v1")
+
+    def testCompactFormatInheritance(self):
+        reversion.register(TestModel, format="compact_json")
+        reversion.register(TestModelParent, format="compact_json", follow=("testmodel_ptr",))
+        with reversion.create_revision():
+            obj = TestModelParent.objects.create()
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict, {
+            "id": obj.pk,
+            "name": "v1",
+            "related": [],
+            "parent_name": "parent v1",
+            "testmodel_ptr_id": obj.pk,
+        })
+
+
+class CompressionTest(TestBase):
+
+    def testCompressionZlib(self):
+        reversion.register(TestModel, compression="zlib")
+        with reversion.create_revision():
+            obj = TestModel.objects.create(name="v1" * 90)
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version.format, "json+zlib")
+        self.assertEqual(version.field_dict["name"], "v1" * 90)
+
+    def testCompressionLzma(self):
+        reversion.register(TestModel, compression="lzma")
+        with reversion.create_revision():
+            obj = TestModel.objects.create(name="v1" * 90)
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version.format, "json+lzma")
+        self.assertEqual(version.field_dict["name"], "v1" * 90)
+
+    def testCompressionRevert(self):
+        reversion.register(TestModel, compression="zlib")
+        with reversion.create_revision():
+            obj = TestModel.objects.create(name="v1" * 90)
+        obj.name = "v2"
+        obj.save()
+        Version.objects.get_for_object(obj).get().revert()
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "v1" * 90)
+
+    def testCompressionSkippedIfLarger(self):
+        reversion.register(TestModel, compression="zlib")
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        self.assertEqual(Version.objects.get_for_object(obj).get().format, "json")
+
+    def testCompressionUncompressedReadable(self):
+        reversion.register(TestModel)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, compression="zlib")
+        self.assertEqual(Version.objects.get_for_object(obj).get().field_dict["name"], "v1")
+
+    def testCompressionUnknown(self):
+        with self.assertRaises(reversion.RegistrationError):
+            reversion.register(TestModel, compression="boom")
+
+
+class DeltaTest(TestBase):
+
+    def createVersions(self, names):
+        obj = TestModel.objects.create()
+        for name in names:
+            with reversion.create_revision():
+                obj.name = name
+                obj.save()
+        return obj, Version.objects.get_for_object(obj).order_by("pk")
+
+    def testDelta(self):
+        reversion.register(TestModel, keyframe_interval=3)
+        obj, versions = self.createVersions(["v1" * 20, "v2", "v3", "v4", "v5"])
+        self.assertEqual([version.format for version in versions], [
+            "json", "json+delta", "json+delta", "json", "json+delta",
+        ])
+        self.assertEqual([version.field_dict["name"] for version in versions], ["v1" * 20, "v2", "v3", "v4", "v5"])
+
+    def testDeltaKeyframeQueries(self):
+        reversion.register(TestModel, keyframe_interval=10)
+        obj, versions = self.createVersions([f"v{n}" for n in range(20)])
+        with self.assertNumQueries(2):
+            self.assertEqual([version.field_dict["name"] for version in versions], [f"v{n}" for n in range(20)])
+        self.assertEqual(sum("+delta" in version.format for version in versions), 18)
+
+    def testDeltaCompactFormat(self):
+        reversion.register(TestModel, format="compact_json", keyframe_interval=2)
+        obj_related = TestModelRelated.objects.create()
+        obj, versions = self.createVersions(["v1" * 20])
+        with reversion.create_revision():
+            obj.related.add(obj_related)
+        self.assertEqual([version.format for version in versions], ["compact_json", "compact_json+delta"])
+        self.assertEqual(versions[1].field_dict, {
+            "id": obj.pk,
+            "name": "v1" * 20,
+            "related": [obj_related.pk],
+        })
+
+    def testDeltaRevert(self):
+        reversion.register(TestModel, keyframe_interval=3)
+        obj, versions = self.createVersions(["v1" * 20, "v2", "v3"])
+        versions[1].revert()
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "v2")
+
+    def testDeltaM2M(self):
+        reversion.register(TestModel, keyframe_interval=3)
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.related.add(obj_related)
+        version = Version.objects.get_for_object(obj).first()
+        self.assertEqual(version.format, "json+delta")
+        self.assertEqual(version.field_dict["related"], [obj_related.pk])
+
+    def testDeltaMissingKeyframe(self):
+        reversion.register(TestModel, keyframe_interval=3)
+        obj, versions = self.createVersions(["v1" * 20, "v2"])
+        versions[0].delete()
+        with self.assertRaises(RevertError):
+            Version.objects.get_for_object(obj).get().field_dict
+
+    def testDeltaUnsupportedFormat(self):
+        with self.assertRaises(reversion.RegistrationError):
+            reversion.register(TestModel, format="xml", keyframe_interval=3)
+
+
+class DeduplicateTest(TestBase):
+
+    def testDeduplicate(self):
+        reversion.register(TestModel, deduplicate=True)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.save()
+        versions = Version.objects.get_for_object(obj)
+        self.assertEqual(VersionPayload.objects.count(), 1)
+        self.assertEqual(versions[0].payload_id, versions[1].payload_id)
+        self.assertEqual(versions[0].serialized_data, "")
+        self.assertEqual(versions[0].field_dict["name"], "v1")
+
+    def testDeduplicateChanged(self):
+        reversion.register(TestModel, deduplicate=True)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        self.assertEqual(VersionPayload.objects.count(), 2)
+        self.assertEqual(Version.objects.get_for_object(obj)[0].field_dict["name"], "v2")
+
+    def testDeduplicateGetUnique(self):
+        reversion.register(TestModel, deduplicate=True)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.save()
+        self.assertEqual(len(list(Version.objects.get_for_object(obj).get_unique())), 1)
+
+    def testDeduplicateIgnoreDuplicates(self):
+        reversion.register(TestModel, deduplicate=True, ignore_duplicates=True)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.save()
+        self.assertEqual(Version.objects.get_for_object(obj).count(), 1)
+
+    def testDeduplicateCompression(self):
+        reversion.register(TestModel, deduplicate=True, compression="zlib")
+        with reversion.create_revision():
+            obj = TestModel.objects.create(name="v1" * 90)
+        with reversion.create_revision():
+            obj.save()
+        versions = Version.objects.get_for_object(obj)
+        self.assertEqual(VersionPayload.objects.count(), 1)
+        self.assertEqual(versions[0].format, "json+zlib")
+        self.assertEqual(versions[0].field_dict["name"], "v1" * 90)
+
+
+class JSONStorageTest(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        reversion.register(TestModel, format="python")
+
+    def testJSONStorage(self):
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            obj.related.add(obj_related)
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version.serialized_data, "")
+        self.assertEqual(version.serialized_json["fields"], {
+            "name": "v1",
+            "related": [obj_related.pk],
+        })
+        self.assertEqual(version.field_dict, {
+            "id": obj.pk,
+            "name": "v1",
+            "related": [obj_related.pk],
+        })
+
+    def testJSONStorageRevert(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        obj.name = "v2"
+        obj.save()
+        Version.objects.get_for_object(obj).get().revert()
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "v1")
+
+    def testFilterField(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        versions = Version.objects.get_for_object(obj)
+        self.assertEqual(versions.filter_field("name", "v2").get().field_dict["name"], "v2")
+        self.assertEqual(versions.filter_field("name", "v", lookup="startswith").count(), 2)
+        self.assertEqual(versions.filter_field("pk", obj.pk).count(), 2)
+
+    def testValuesField(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        self.assertEqual(list(Version.objects.get_for_object(obj).values_field("name")), ["v2", "v1"])
+
+    def testJSONStorageCompression(self):
+        with self.assertRaises(reversion.RegistrationError):
+            reversion.register(TestModelRelated, format="python", compression="zlib")
+
+
+class FieldChangesTest(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        reversion.register(TestModel, track_changes=True)
+
+    def testFieldChanges(self):
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        with reversion.create_revision():
+            obj.related.add(obj_related)
+        versions = Version.objects.get_for_object(obj)
+        self.assertEqual(
+            [set(version.field_changes.values_list("field_name", flat=True)) for version in versions],
+            [{"related"}, {"name"}, {"id", "name", "related"}],
+        )
+
+    def testGetFieldChanges(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj.name = "v2"
+            obj.save()
+        with reversion.create_revision():
+            obj.save()
+        versions = Version.objects.get_for_object(obj)
+        self.assertEqual(
+            [version.field_dict["name"] for version in versions.get_field_changes("name")],
+            ["v2", "v1"],
+        )
+        self.assertEqual(versions.get_field_changes("id").count(), 1)
+
+    def testFieldChangesUntracked(self):
+        with reversion.create_revision():
+            obj = TestModelRelated.objects.create()
+        reversion.register(TestModelRelated)
+        with reversion.create_revision():
+            obj.save()
+        self.assertEqual(Version.objects.get_for_object(obj).get_field_changes("name").count(), 0)
+
+
+class GetFieldTest(TestModelMixin, TestBase):
+
+    def testGetField(self):
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            obj.related.add(obj_related)
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version.get_field("name"), "v1")
+        self.assertEqual(version.get_field("id"), obj.pk)
+        self.assertEqual(version.get_field("related"), [obj_related.pk])
+
+    def testGetFieldMissing(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        version = Version.objects.get_for_object(obj).get()
+        with self.assertRaises(KeyError):
+            version.get_field("testmodelinline")
+
+    def testGetFieldAdded(self):
+        reversion.unregister(TestModel)
+        reversion.register(TestModel, fields=("id", "related"))
+        with reversion.create_revision():
+            obj = TestModel.objects.create(name="v2")
+        reversion.unregister(TestModel)
+        reversion.register(TestModel)
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version.get_field("name"), "v1")
+        self.assertEqual(version.get_field("name"), version.field_dict["name"])
+
+    def testGetFieldForeignKey(self):
+        reversion.register(TestModelInline)
+        obj = TestModel.objects.create()
+        with reversion.create_revision():
+            obj_inline = TestModelInline.objects.create(test_model=obj)
+        version = Version.objects.get_for_object(obj_inline).get()
+        self.assertEqual(version.get_field("test_model"), obj.pk)
+        self.assertEqual(version.get_field("test_model_id"), obj.pk)
+
+
+class GetFieldFormatTest(TestBase):
+
+    def assertGetField(self, **options):
+        reversion.register(TestModel, **options)
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        self.assertEqual(Version.objects.get_for_object(obj).get().get_field("name"), "v1")
+
+    def testGetFieldCompactFormat(self):
+        self.assertGetField(format="compact_json")
+
+    def testGetFieldPythonFormat(self):
+        self.assertGetField(format="python")
+
+    def testGetFieldXMLFormat(self):
+        self.assertGetField(format="xml")
+
+
+class GetFieldInheritanceTest(TestModelParentMixin, TestBase):
+
+    def testGetFieldInheritance(self):
+        with reversion.create_revision():
+            obj = TestModelParent.objects.create()
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version.get_field("parent_name"), "parent v1")
+        self.assertEqual(version.get_field("name"), "v1")
+
+
+class WithFieldDictsTest(TestModelParentMixin, TestBase):
+
+    def testWithFieldDicts(self):
+        with reversion.create_revision():
+            objs = [TestModelParent.objects.create(name=str(n)) for n in range(3)]
+        versions = Version.objects.get_for_model(TestModelParent).order_by("pk")
+        expected = [version.field_dict for version in versions]
+        with self.assertNumQueries(2):
+            field_dicts = [version.field_dict for version in versions.with_field_dicts()]
+        self.assertEqual(field_dicts, expected)
+        self.assertEqual([field_dict["name"] for field_dict in field_dicts], [obj.name for obj in objs])
+
+    def testWithFieldDictsMissingParent(self):
+        with reversion.create_revision():
+            obj = TestModelParent.objects.create()
+        Version.objects.get_for_model(TestModel).delete()
+        version = Version.objects.get_for_object(obj).with_field_dicts().get()
+        with self.assertRaises(Version.DoesNotExist):
+            version.field_dict
+
+
+class CompiledDeserializerTest(TestModelMixin, TestBase):
+
+    def testCompiledDeserializer(self):
+        obj_related = TestModelRelated.objects.create()
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+            obj.related.add(obj_related)
+        version = Version.objects.get_for_object(obj).get()
+        object_version = version._load_object_version_compiled()
+        self.assertEqual(object_version.object.name, "v1")
+        self.assertEqual(object_version.object.pk, obj.pk)
+        self.assertEqual(object_version.m2m_data, {"related": [obj_related.pk]})
+        self.assertEqual(version.field_dict, {"id": obj.pk, "name": "v1", "related": [obj_related.pk]})
+
+    def testCompiledDeserializerRemovedField(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        Version.objects.get_for_object(obj).update(serialized_data=json.dumps([{
+            "model": "test_app.testmodel",
+            "pk": obj.pk,
+            "fields": {"name": "v1", "removed": "v1"},
+        }]))
+        version = Version.objects.get_for_object(obj).get()
+        self.assertEqual(version._load_object_version_compiled().object.name, "v1")
+
+    def testCompiledDeserializerInvalidValue(self):
+        with reversion.create_revision():
+            obj = TestModel.objects.create()
+        Version.objects.get_for_object(obj).update(serialized_data=json.dumps([{
+            "model": "test_app.testmodel",
+            "pk": "boom",
+            "fields": {},
+        }]))
+        version = Version.objects.get_for_object(obj).get()
+        self.assertIsNone(version._load_object_version_compiled())
+        with self.assertRaises(RevertError):
+            version.revert()
+
+    def testCompiledDeserializerNaturalKey(self):
+        reversion.register(TestModelInlineByNaturalKey)
+        inline = TestModelWithNaturalKey.objects.create()
+        with reversion.create_revision():
+            obj = TestModelInlineByNaturalKey.objects.create(test_model=inline)
+        Version.objects.get_for_object(obj).update(serialized_data=json.dumps([{
+            "model": "test_app.testmodelinlinebynaturalkey",
+            "pk": obj.pk,
+            "fields": {"test_model": ["v1"]},
+        }]))
+        version = Version.objects.get_for_object(obj).get()
+        self.assertIsNone(version._load_object_version_compiled())
+        self.assertEqual(version.field_dict["test_model_id"], inline.pk)
+
+
 class M2MTest(TestModelMixin, TestBase):
 
     def testM2MSave(self):